@@ -9,10 +9,12 @@ from alembic import context
 from linkedin_insights.db.base import Base
 from linkedin_insights.models.insight import Insight, ScraperRun
 from linkedin_insights.models.linkedin import (
+    Industry,
     LinkedInPage,
     SocialMediaUser,
     Post,
     Comment,
+    PageSummary,
 )
 from linkedin_insights.utils.config import settings
 
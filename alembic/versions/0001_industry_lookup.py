@@ -0,0 +1,98 @@
+"""Move linkedin_pages.industry into an industries lookup table
+
+Revision ID: 0001_industry_lookup
+Revises:
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_industry_lookup'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+IndustryId = sa.SmallInteger().with_variant(sa.Integer(), "sqlite")
+
+
+def _columns(table: str) -> set:
+    return {col["name"] for col in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table: str) -> set:
+    return {idx["name"] for idx in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Earlier schemas were created with Base.metadata.create_all, so check first
+    if not sa.inspect(bind).has_table("industries"):
+        op.create_table(
+            "industries",
+            sa.Column("id", IndustryId, primary_key=True, autoincrement=True),
+            sa.Column("name", sa.String(255), nullable=False, unique=True),
+        )
+
+    if "industry" not in _columns("linkedin_pages"):
+        return
+
+    with op.batch_alter_table("linkedin_pages") as batch_op:
+        batch_op.add_column(sa.Column("industry_id", IndustryId, nullable=True))
+
+    # Backfill: one lookup row per distinct name, then point pages at it
+    op.execute(
+        "INSERT INTO industries (name) "
+        "SELECT DISTINCT industry FROM linkedin_pages "
+        "WHERE industry IS NOT NULL AND industry NOT IN (SELECT name FROM industries)"
+    )
+    op.execute(
+        "UPDATE linkedin_pages SET industry_id = "
+        "(SELECT industries.id FROM industries WHERE industries.name = linkedin_pages.industry) "
+        "WHERE industry IS NOT NULL"
+    )
+
+    existing = _indexes("linkedin_pages")
+    with op.batch_alter_table("linkedin_pages") as batch_op:
+        for name in ("idx_name_industry", "idx_industry_followers", "ix_linkedin_pages_industry"):
+            if name in existing:
+                batch_op.drop_index(name)
+        batch_op.create_foreign_key(
+            "fk_linkedin_pages_industry_id", "industries", ["industry_id"], ["id"]
+        )
+        batch_op.drop_column("industry")
+        batch_op.create_index("ix_linkedin_pages_industry_id", ["industry_id"])
+        batch_op.create_index("idx_name_industry", ["name", "industry_id"])
+        batch_op.create_index("idx_industry_followers", ["industry_id", "total_followers"])
+
+
+def downgrade() -> None:
+    if "industry_id" not in _columns("linkedin_pages"):
+        return
+
+    with op.batch_alter_table("linkedin_pages") as batch_op:
+        batch_op.add_column(sa.Column("industry", sa.String(255), nullable=True))
+
+    op.execute(
+        "UPDATE linkedin_pages SET industry = "
+        "(SELECT industries.name FROM industries WHERE industries.id = linkedin_pages.industry_id) "
+        "WHERE industry_id IS NOT NULL"
+    )
+
+    existing = _indexes("linkedin_pages")
+    with op.batch_alter_table("linkedin_pages") as batch_op:
+        for name in ("idx_name_industry", "idx_industry_followers", "ix_linkedin_pages_industry_id"):
+            if name in existing:
+                batch_op.drop_index(name)
+        for fk in sa.inspect(op.get_bind()).get_foreign_keys("linkedin_pages"):
+            if fk["referred_table"] == "industries" and fk["name"]:
+                batch_op.drop_constraint(fk["name"], type_="foreignkey")
+        batch_op.drop_column("industry_id")
+        batch_op.create_index("ix_linkedin_pages_industry", ["industry"])
+        batch_op.create_index("idx_name_industry", ["name", "industry"])
+        batch_op.create_index("idx_industry_followers", ["industry", "total_followers"])
+
+    op.drop_table("industries")
@@ -112,7 +112,7 @@ async def generate_summary_from_stats(
     stats_dict['generated_at'] = None  # Will be set by service
     
     # Generate summary
-    summary = ai_service.generate_summary(stats_dict)
+    summary = await ai_service.generate_summary(stats_dict)
     
     if not summary:
         raise HTTPException(
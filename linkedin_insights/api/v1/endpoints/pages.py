@@ -4,13 +4,13 @@ Async endpoints for LinkedIn company pages with Redis caching
 """
 import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from linkedin_insights.db.base import get_db
 from linkedin_insights.db.repositories import LinkedInPageRepository, PostRepository, SocialMediaUserRepository
-from linkedin_insights.models.linkedin import LinkedInPage, Post, SocialMediaUser
+from linkedin_insights.models.linkedin import Industry, LinkedInPage, Post, SocialMediaUser
 from linkedin_insights.schemas.linkedin import (
     LinkedInPageResponse,
     PaginatedLinkedInPageResponse,
@@ -18,12 +18,13 @@ from linkedin_insights.schemas.linkedin import (
     PaginatedSocialMediaUserResponse,
 )
 from linkedin_insights.services.linkedin_page_service import LinkedInPageService
-from linkedin_insights.scraper.page_scraper import LinkedInPageScraper
+from linkedin_insights.services.scraper_service import ScraperService
 from linkedin_insights.utils.pagination import (
     PaginationParams,
     paginate_query,
     paginate_query_with_filters,
     get_pagination_dependency,
+    pagination_headers,
 )
 from linkedin_insights.utils.cache import (
     get_cache,
@@ -34,6 +35,7 @@ from linkedin_insights.utils.cache import (
     get_cache_key_for_page_followers,
     invalidate_page_cache,
 )
+from linkedin_insights.utils.concurrent_limiter import ConcurrencyLimitExceeded
 from linkedin_insights.utils.config import settings
 
 logger = logging.getLogger(__name__)
@@ -41,7 +43,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/{page_id}", response_model=LinkedInPageResponse, status_code=status.HTTP_200_OK)
+@router.get(
+    "/{page_id}",
+    response_model=LinkedInPageResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_200_OK,
+)
 async def get_page(
     page_id: str,
     db: AsyncSession = Depends(get_db)
@@ -52,7 +59,9 @@ async def get_page(
     - If page exists in DB → return from DB (cached for 5 minutes)
     - If not → scrape LinkedIn, store in DB, return response
     
-    Responses are cached for 5 minutes.
+    Fields the scrape didn't find are omitted rather than sent as null
+    (dropped by pydantic-core while serializing). Responses are cached for
+    5 minutes.
     """
     # Try to get from cache first
     cache_key = get_cache_key_for_page(page_id)
@@ -76,8 +85,7 @@ async def get_page(
     logger.info(f"Page {page_id} not found in database, scraping...")
     
     try:
-        scraper = LinkedInPageScraper()
-        scraped_data = await scraper.scrape_page(page_id)
+        scraped_data = await ScraperService().scrape_linkedin_page(page_id)
         
         if scraped_data.get('error'):
             raise HTTPException(
@@ -111,6 +119,11 @@ async def get_page(
     
     except HTTPException:
         raise
+    except ConcurrencyLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error scraping page {page_id}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -167,7 +180,12 @@ async def get_pages(
         query = query.where(LinkedInPage.total_followers <= follower_count_max)
     
     if industry:
-        query = query.where(LinkedInPage.industry.ilike(f"%{industry}%"))
+        # Match names in the small lookup table, then filter pages by integer id
+        query = query.where(
+            LinkedInPage.industry_id.in_(
+                select(Industry.id).where(Industry.name.ilike(f"%{industry}%"))
+            )
+        )
     
     if page_name:
         query = query.where(LinkedInPage.name.ilike(f"%{page_name}%"))
@@ -182,25 +200,37 @@ async def get_pages(
     return response_data
 
 
-@router.get("/{page_id}/posts", response_model=PaginatedPostResponse, status_code=status.HTTP_200_OK)
+@router.api_route(
+    "/{page_id}/posts",
+    methods=["GET", "HEAD"],
+    response_model=PaginatedPostResponse,
+    status_code=status.HTTP_200_OK,
+)
 async def get_page_posts(
+    request: Request,
+    response: Response,
     page_id: str,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(15, ge=1, le=50, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor from a previous response)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get posts for a LinkedIn page
     
     Returns recent 10-15 posts (default 15) with pagination support.
+    Pass `cursor` from a previous response's `next_cursor` to seek to the
+    next page without an OFFSET scan.
+    Pagination metadata is mirrored in X-Total-Count / Link headers; a HEAD
+    request returns only the headers.
     Responses are cached for 5 minutes.
     """
     # Try to get from cache
-    cache_key = get_cache_key_for_page_posts(page_id, page, page_size)
+    cache_key = get_cache_key_for_page_posts(page_id, page, page_size, cursor)
     cached_result = await get_cache(cache_key)
     if cached_result is not None:
         logger.info(f"Page {page_id} posts served from cache")
-        return cached_result
+        return _paginated_response(request, response, cached_result)
     
     page_repo = LinkedInPageRepository(LinkedInPage, db)
     
@@ -216,23 +246,36 @@ async def get_page_posts(
     query = select(Post).where(Post.page_id == linkedin_page.id)
     
     # Use pagination utility with ordering
-    pagination = PaginationParams(page=page, page_size=page_size)
-    result = await paginate_query_with_filters(
-        query, 
-        db,
-        pagination, 
-        order_by=Post.posted_at.desc()
-    )
+    pagination = PaginationParams(page=page, page_size=page_size, cursor=cursor)
+    try:
+        result = await paginate_query_with_filters(
+            query, 
+            db,
+            pagination, 
+            order_by=Post.posted_at.desc()
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     response_data = result.to_dict()
     
     # Cache the response
     await set_cache(cache_key, response_data, ttl=settings.REDIS_CACHE_TTL)
     
-    return response_data
+    return _paginated_response(request, response, response_data)
 
 
-@router.get("/{page_id}/followers", response_model=PaginatedSocialMediaUserResponse, status_code=status.HTTP_200_OK)
+@router.api_route(
+    "/{page_id}/followers",
+    methods=["GET", "HEAD"],
+    response_model=PaginatedSocialMediaUserResponse,
+    status_code=status.HTTP_200_OK,
+)
 async def get_page_followers(
+    request: Request,
+    response: Response,
     page_id: str,
     pagination: PaginationParams = Depends(get_pagination_dependency),
     db: AsyncSession = Depends(get_db)
@@ -241,6 +284,8 @@ async def get_page_followers(
     Get employees/followers for a LinkedIn page
     
     Returns list of employees/followers with pagination support.
+    Pagination metadata is mirrored in X-Total-Count / Link headers; a HEAD
+    request returns only the headers.
     Responses are cached for 5 minutes.
     """
     # Try to get from cache
@@ -248,7 +293,7 @@ async def get_page_followers(
     cached_result = await get_cache(cache_key)
     if cached_result is not None:
         logger.info(f"Page {page_id} followers served from cache")
-        return cached_result
+        return _paginated_response(request, response, cached_result)
     
     page_repo = LinkedInPageRepository(LinkedInPage, db)
     
@@ -270,4 +315,13 @@ async def get_page_followers(
     # Cache the response
     await set_cache(cache_key, response_data, ttl=settings.REDIS_CACHE_TTL)
     
-    return response_data
+    return _paginated_response(request, response, response_data)
+
+
+def _paginated_response(request: Request, response: Response, data: dict):
+    """Attach pagination headers; answer HEAD requests with the headers alone"""
+    headers = pagination_headers(request, data)
+    if request.method == "HEAD":
+        return Response(status_code=status.HTTP_200_OK, headers=headers)
+    response.headers.update(headers)
+    return data
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from linkedin_insights.db.base import get_db
 from linkedin_insights.schemas.scraper import ScrapeRequest, ScrapeResponse
 from linkedin_insights.services.scraper_service import ScraperService
+from linkedin_insights.utils.concurrent_limiter import ConcurrencyLimitExceeded
 
 router = APIRouter()
 
@@ -22,6 +23,11 @@ async def scrape_profile(
     try:
         result = await service.scrape_linkedin_page(str(request.profile_url))
         return ScrapeResponse(**result)
+    except ConcurrencyLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
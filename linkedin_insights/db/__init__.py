@@ -3,10 +3,12 @@
 from linkedin_insights.db.base import Base, get_db, engine, AsyncSessionLocal
 from linkedin_insights.db.repository import BaseRepository
 from linkedin_insights.db.repositories import (
+    IndustryRepository,
     LinkedInPageRepository,
     PostRepository,
     CommentRepository,
     SocialMediaUserRepository,
+    PageSummaryRepository,
 )
 
 __all__ = [
@@ -15,9 +17,11 @@ __all__ = [
     "engine",
     "AsyncSessionLocal",
     "BaseRepository",
+    "IndustryRepository",
     "LinkedInPageRepository",
     "PostRepository",
     "CommentRepository",
     "SocialMediaUserRepository",
+    "PageSummaryRepository",
 ]
 
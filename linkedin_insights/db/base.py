@@ -20,6 +20,8 @@ engine = create_async_engine(
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20,
+    # Rows per multi-VALUES INSERT when executing insert() with a list of rows
+    insertmanyvalues_page_size=1000,
     echo=False,
 )
 
@@ -6,17 +6,47 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, update, and_
 
 from linkedin_insights.models.linkedin import (
+    Industry,
     LinkedInPage,
     SocialMediaUser,
     Post,
     Comment,
+    PageSummary,
 )
 from linkedin_insights.db.repository import BaseRepository
 
 
+class IndustryRepository(BaseRepository[Industry]):
+    """Repository for the Industry lookup table"""
+    
+    async def get_or_create(self, name: str) -> Industry:
+        """
+        Get industry by name, creating it if missing
+        Safe against a concurrent insert of the same name
+        """
+        result = await self.db.execute(
+            select(self.model).filter(self.model.name == name)
+        )
+        industry = result.scalar_one_or_none()
+        if industry is not None:
+            return industry
+        
+        try:
+            async with self.db.begin_nested():
+                industry = self.model(name=name)
+                self.db.add(industry)
+            return industry
+        except IntegrityError:
+            # Another writer inserted it first
+            result = await self.db.execute(
+                select(self.model).filter(self.model.name == name)
+            )
+            return result.scalar_one()
+
+
 class LinkedInPageRepository(BaseRepository[LinkedInPage]):
     """Repository for LinkedInPage model with async upsert support"""
     
@@ -34,15 +64,25 @@ class LinkedInPageRepository(BaseRepository[LinkedInPage]):
         )
         return result.scalar_one_or_none()
     
-    async def upsert(self, page_data: Dict[str, Any]) -> LinkedInPage:
+    async def upsert(self, page_data: Dict[str, Any], commit: bool = True) -> LinkedInPage:
         """
         Upsert page by page_id
         Creates if not exists, updates if exists
+        Pass commit=False to only flush, leaving the commit to the caller
         """
         page_id = page_data.get('page_id')
         if not page_id:
             raise ValueError("page_id is required")
         
+        # Pages store the industry as a lookup-table id
+        if 'industry' in page_data:
+            page_data = dict(page_data)
+            industry_name = page_data.pop('industry')
+            page_data['industry_ref'] = (
+                await IndustryRepository(Industry, self.db).get_or_create(industry_name)
+                if industry_name else None
+            )
+        
         # Try to find existing page
         existing_page = await self.get_by_page_id(page_id)
         
@@ -51,15 +91,21 @@ class LinkedInPageRepository(BaseRepository[LinkedInPage]):
             for key, value in page_data.items():
                 if key != 'page_id' and hasattr(existing_page, key):
                     setattr(existing_page, key, value)
-            await self.db.commit()
-            await self.db.refresh(existing_page)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(existing_page)
+            else:
+                await self.db.flush()
             return existing_page
         else:
             # Create new page
             db_page = self.model(**page_data)
             self.db.add(db_page)
-            await self.db.commit()
-            await self.db.refresh(db_page)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(db_page)
+            else:
+                await self.db.flush()
             return db_page
 
 
@@ -83,10 +129,11 @@ class PostRepository(BaseRepository[Post]):
         )
         return list(result.scalars().all())
     
-    async def upsert(self, post_data: Dict[str, Any], page_id: int) -> Post:
+    async def upsert(self, post_data: Dict[str, Any], page_id: int, commit: bool = True) -> Post:
         """
         Upsert post by post_id
         Creates if not exists, updates if exists
+        Pass commit=False to only flush, leaving the commit to the caller
         """
         post_id = post_data.get('post_id')
         if not post_id:
@@ -100,39 +147,63 @@ class PostRepository(BaseRepository[Post]):
             for key, value in post_data.items():
                 if key not in ('post_id', 'page_id') and hasattr(existing_post, key):
                     setattr(existing_post, key, value)
-            await self.db.commit()
-            await self.db.refresh(existing_post)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(existing_post)
+            else:
+                await self.db.flush()
             return existing_post
         else:
             # Create new post
             post_data['page_id'] = page_id
             db_post = self.model(**post_data)
             self.db.add(db_post)
-            await self.db.commit()
-            await self.db.refresh(db_post)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(db_post)
+            else:
+                await self.db.flush()
             return db_post
     
     async def upsert_batch(self, posts_data: List[Dict[str, Any]], page_id: int) -> List[Post]:
         """Upsert multiple posts in batch"""
-        upserted_posts = []
-        for post_data in posts_data:
-            try:
-                post = await self.upsert(post_data, page_id)
-                upserted_posts.append(post)
-            except IntegrityError:
-                await self.db.rollback()
-                # Retry once after rollback
-                try:
-                    post = await self.upsert(post_data, page_id)
-                    upserted_posts.append(post)
-                except Exception as e:
-                    await self.db.rollback()
-                    continue
-            except Exception as e:
-                await self.db.rollback()
-                continue
+        return await self._upsert_batch(
+            posts_data, lambda post_data: self.upsert(post_data, page_id, commit=False)
+        )
+
+    async def bulk_upsert(self, posts_data: List[Dict[str, Any]], page_id: int) -> Dict[str, int]:
+        """
+        Upsert many posts with one SELECT, one bulk UPDATE and one multi-row INSERT
+        Does not commit; runs in the caller's transaction
         
-        return upserted_posts
+        Returns:
+            Mapping of LinkedIn post_id to database id for every upserted post
+        """
+        rows = {row['post_id']: row for row in posts_data}
+        if not rows:
+            return {}
+        
+        result = await self.db.execute(
+            select(self.model.id, self.model.post_id).filter(self.model.post_id.in_(list(rows)))
+        )
+        ids = {post_id: id for id, post_id in result.all()}
+        
+        update_rows = [
+            {**{k: v for k, v in row.items() if k not in ('post_id', 'page_id')}, 'id': ids[post_id]}
+            for post_id, row in rows.items() if post_id in ids
+        ]
+        if update_rows:
+            await self.db.execute(update(self.model), update_rows)
+        
+        insert_rows = [{**row, 'page_id': page_id} for post_id, row in rows.items() if post_id not in ids]
+        if insert_rows:
+            result = await self.db.execute(
+                insert(self.model).returning(self.model.id, self.model.post_id),
+                insert_rows
+            )
+            ids.update({post_id: id for id, post_id in result.all()})
+        
+        return ids
 
 
 class CommentRepository(BaseRepository[Comment]):
@@ -155,10 +226,11 @@ class CommentRepository(BaseRepository[Comment]):
         )
         return list(result.scalars().all())
     
-    async def upsert(self, comment_data: Dict[str, Any], post_id: int) -> Comment:
+    async def upsert(self, comment_data: Dict[str, Any], post_id: int, commit: bool = True) -> Comment:
         """
         Upsert comment by comment_id
         Creates if not exists, updates if exists
+        Pass commit=False to only flush, leaving the commit to the caller
         """
         comment_id = comment_data.get('comment_id')
         if not comment_id:
@@ -172,39 +244,59 @@ class CommentRepository(BaseRepository[Comment]):
             for key, value in comment_data.items():
                 if key not in ('comment_id', 'post_id') and hasattr(existing_comment, key):
                     setattr(existing_comment, key, value)
-            await self.db.commit()
-            await self.db.refresh(existing_comment)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(existing_comment)
+            else:
+                await self.db.flush()
             return existing_comment
         else:
             # Create new comment
             comment_data['post_id'] = post_id
             db_comment = self.model(**comment_data)
             self.db.add(db_comment)
-            await self.db.commit()
-            await self.db.refresh(db_comment)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(db_comment)
+            else:
+                await self.db.flush()
             return db_comment
     
     async def upsert_batch(self, comments_data: List[Dict[str, Any]], post_id: int) -> List[Comment]:
         """Upsert multiple comments in batch"""
-        upserted_comments = []
-        for comment_data in comments_data:
-            try:
-                comment = await self.upsert(comment_data, post_id)
-                upserted_comments.append(comment)
-            except IntegrityError:
-                await self.db.rollback()
-                # Retry once after rollback
-                try:
-                    comment = await self.upsert(comment_data, post_id)
-                    upserted_comments.append(comment)
-                except Exception as e:
-                    await self.db.rollback()
-                    continue
-            except Exception as e:
-                await self.db.rollback()
-                continue
+        return await self._upsert_batch(
+            comments_data, lambda comment_data: self.upsert(comment_data, post_id, commit=False)
+        )
+
+    async def bulk_upsert(self, comments_data: List[Dict[str, Any]]) -> int:
+        """
+        Upsert many comments with one SELECT, one bulk UPDATE and one multi-row INSERT
+        Each row must carry its post_id (database id). Does not commit.
+        
+        Returns:
+            Number of comments upserted
+        """
+        rows = {row['comment_id']: row for row in comments_data}
+        if not rows:
+            return 0
+        
+        result = await self.db.execute(
+            select(self.model.id, self.model.comment_id).filter(self.model.comment_id.in_(list(rows)))
+        )
+        ids = {comment_id: id for id, comment_id in result.all()}
+        
+        update_rows = [
+            {**{k: v for k, v in row.items() if k not in ('comment_id', 'post_id')}, 'id': ids[comment_id]}
+            for comment_id, row in rows.items() if comment_id in ids
+        ]
+        if update_rows:
+            await self.db.execute(update(self.model), update_rows)
         
-        return upserted_comments
+        insert_rows = [row for comment_id, row in rows.items() if comment_id not in ids]
+        if insert_rows:
+            await self.db.execute(insert(self.model), insert_rows)
+        
+        return len(rows)
 
 
 class SocialMediaUserRepository(BaseRepository[SocialMediaUser]):
@@ -232,10 +324,11 @@ class SocialMediaUserRepository(BaseRepository[SocialMediaUser]):
         )
         return list(result.scalars().all())
     
-    async def upsert(self, user_data: Dict[str, Any], page_id: int) -> SocialMediaUser:
+    async def upsert(self, user_data: Dict[str, Any], page_id: int, commit: bool = True) -> SocialMediaUser:
         """
         Upsert user by linkedin_user_id and page_id
         Creates if not exists, updates if exists
+        Pass commit=False to only flush, leaving the commit to the caller
         """
         linkedin_user_id = user_data.get('linkedin_user_id')
         if not linkedin_user_id:
@@ -249,36 +342,103 @@ class SocialMediaUserRepository(BaseRepository[SocialMediaUser]):
             for key, value in user_data.items():
                 if key not in ('linkedin_user_id', 'page_id') and hasattr(existing_user, key):
                     setattr(existing_user, key, value)
-            await self.db.commit()
-            await self.db.refresh(existing_user)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(existing_user)
+            else:
+                await self.db.flush()
             return existing_user
         else:
             # Create new user
             user_data['page_id'] = page_id
             db_user = self.model(**user_data)
             self.db.add(db_user)
-            await self.db.commit()
-            await self.db.refresh(db_user)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(db_user)
+            else:
+                await self.db.flush()
             return db_user
     
     async def upsert_batch(self, users_data: List[Dict[str, Any]], page_id: int) -> List[SocialMediaUser]:
         """Upsert multiple users in batch"""
-        upserted_users = []
-        for user_data in users_data:
-            try:
-                user = await self.upsert(user_data, page_id)
-                upserted_users.append(user)
-            except IntegrityError:
-                await self.db.rollback()
-                # Retry once after rollback
-                try:
-                    user = await self.upsert(user_data, page_id)
-                    upserted_users.append(user)
-                except Exception as e:
-                    await self.db.rollback()
-                    continue
-            except Exception as e:
-                await self.db.rollback()
-                continue
+        return await self._upsert_batch(
+            users_data, lambda user_data: self.upsert(user_data, page_id, commit=False)
+        )
+
+    async def bulk_upsert(self, users_data: List[Dict[str, Any]], page_id: int) -> int:
+        """
+        Upsert many users of a page with one SELECT, one bulk UPDATE and one multi-row INSERT
+        Does not commit; runs in the caller's transaction
+        
+        Returns:
+            Number of users upserted
+        """
+        rows = {row['linkedin_user_id']: row for row in users_data}
+        if not rows:
+            return 0
+        
+        result = await self.db.execute(
+            select(self.model.id, self.model.linkedin_user_id).filter(
+                and_(
+                    self.model.page_id == page_id,
+                    self.model.linkedin_user_id.in_(list(rows))
+                )
+            )
+        )
+        ids = {linkedin_user_id: id for id, linkedin_user_id in result.all()}
+        
+        update_rows = [
+            {**{k: v for k, v in row.items() if k not in ('linkedin_user_id', 'page_id')}, 'id': ids[user_id]}
+            for user_id, row in rows.items() if user_id in ids
+        ]
+        if update_rows:
+            await self.db.execute(update(self.model), update_rows)
         
-        return upserted_users
+        insert_rows = [{**row, 'page_id': page_id} for user_id, row in rows.items() if user_id not in ids]
+        if insert_rows:
+            await self.db.execute(insert(self.model), insert_rows)
+        
+        return len(rows)
+
+
+class PageSummaryRepository(BaseRepository[PageSummary]):
+    """Repository for PageSummary model with async upsert support"""
+    
+    async def get_by_page_id(self, page_id: int) -> Optional[PageSummary]:
+        """Get summary by page_id"""
+        result = await self.db.execute(
+            select(self.model).filter(self.model.page_id == page_id)
+        )
+        return result.scalar_one_or_none()
+    
+    async def upsert(self, summary_data: Dict[str, Any], page_id: int, commit: bool = True) -> PageSummary:
+        """
+        Upsert summary by page_id
+        Creates if not exists, updates if exists
+        Pass commit=False to only flush, leaving the commit to the caller
+        """
+        existing_summary = await self.get_by_page_id(page_id)
+        
+        if existing_summary:
+            # Update existing summary
+            for key, value in summary_data.items():
+                if key != 'page_id' and hasattr(existing_summary, key):
+                    setattr(existing_summary, key, value)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(existing_summary)
+            else:
+                await self.db.flush()
+            return existing_summary
+        else:
+            # Create new summary
+            summary_data['page_id'] = page_id
+            db_summary = self.model(**summary_data)
+            self.db.add(db_summary)
+            if commit:
+                await self.db.commit()
+                await self.db.refresh(db_summary)
+            else:
+                await self.db.flush()
+            return db_summary
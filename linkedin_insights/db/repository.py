@@ -2,12 +2,13 @@
 Repository pattern base class
 Abstract base repository for async database operations
 """
-from typing import Generic, TypeVar, Type, Optional, List
+from typing import Any, Awaitable, Callable, Dict, Generic, TypeVar, Type, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from linkedin_insights.db.base import Base
+from linkedin_insights.utils.db_helpers import bulk_refresh
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -57,3 +58,36 @@ class BaseRepository(Generic[ModelType]):
             await self.db.commit()
             return True
         return False
+    
+    async def _upsert_batch(
+        self,
+        rows: List[Dict[str, Any]],
+        upsert: Callable[[Dict[str, Any]], Awaitable[ModelType]],
+    ) -> List[ModelType]:
+        """
+        Upsert rows one savepoint each, retrying a row once on IntegrityError
+        
+        A failing row is skipped without losing the others. Everything is
+        committed once at the end and the upserted objects are reloaded with
+        one SELECT per model rather than one refresh per row.
+        
+        Args:
+            rows: Row dicts to upsert
+            upsert: Upserts one row without committing (commit=False)
+        """
+        upserted = []
+        for row in rows:
+            for _ in range(2):
+                try:
+                    async with self.db.begin_nested():
+                        upserted.append(await upsert(row))
+                    break
+                except IntegrityError:
+                    # Retry once (e.g. a concurrent insert of the same row)
+                    continue
+                except Exception:
+                    break
+        
+        await self.db.commit()
+        await bulk_refresh(self.db, upserted)
+        return upserted
@@ -2,27 +2,43 @@
 Main application entry point
 FastAPI app initialization and configuration
 """
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from linkedin_insights.api.v1.router import api_router
+from linkedin_insights.scraper.pool import get_scraper_pool
 from linkedin_insights.utils.config import settings
-from linkedin_insights.utils.logging import setup_logging
-from linkedin_insights.utils.redis_client import get_redis_client, close_redis_client
+from linkedin_insights.utils.logging import setup_logging, shutdown_logging
+from linkedin_insights.utils.redis_client import init_redis, close_redis
 
 # Initialize logging
 setup_logging()
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
-    # Startup: Initialize Redis connection
-    await get_redis_client()
+    # Startup: Ensure the logging listener is running (no-op on first start)
+    setup_logging()
+    # Startup: Initialize the shared Redis client and connection pool
+    await init_redis(app)
+    # Startup: Launch the shared scraper browser (falls back to lazy start on first scrape)
+    scraper_pool = get_scraper_pool()
+    try:
+        await scraper_pool.start()
+    except Exception as e:
+        logger.error(f"Failed to start scraper pool: {str(e)}")
     yield
-    # Shutdown: Close Redis connection
-    await close_redis_client()
+    # Shutdown: Close browser and Redis connection
+    await scraper_pool.stop()
+    await close_redis(app)
+    # Shutdown: Flush and stop the logging listener
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -31,6 +47,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
     lifespan=lifespan,
+    # Encode responses with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
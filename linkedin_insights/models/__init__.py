@@ -3,18 +3,22 @@
 from linkedin_insights.models.base import BaseModel
 from linkedin_insights.models.insight import Insight, ScraperRun
 from linkedin_insights.models.linkedin import (
+    Industry,
     LinkedInPage,
     SocialMediaUser,
     Post,
     Comment,
+    PageSummary,
 )
 
 __all__ = [
     "BaseModel",
     "Insight",
     "ScraperRun",
+    "Industry",
     "LinkedInPage",
     "SocialMediaUser",
     "Post",
     "Comment",
+    "PageSummary",
 ]
@@ -1,17 +1,35 @@
 """
 LinkedIn models
-SQLAlchemy ORM models for LinkedIn pages, users, posts, and comments
+SQLAlchemy ORM models for LinkedIn pages, users, posts, comments, and AI summaries
 """
+from typing import Optional
+
 from sqlalchemy import (
-    Column, String, Integer, Text, ForeignKey, DateTime, 
+    Column, String, Integer, SmallInteger, Text, ForeignKey, DateTime, 
     Index, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
+from linkedin_insights.db.base import Base
 from linkedin_insights.models.base import BaseModel
 
 
+# SMALLINT id; SQLite only autoincrements an INTEGER PRIMARY KEY (rowid alias)
+IndustryId = SmallInteger().with_variant(Integer, "sqlite")
+
+
+class Industry(Base):
+    """Industry lookup table (small, so pages store a SMALLINT id instead of the name)"""
+    __tablename__ = "industries"
+    
+    id = Column(IndustryId, primary_key=True, autoincrement=True)
+    name = Column(String(255), unique=True, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<Industry(id={self.id}, name='{self.name}')>"
+
+
 class LinkedInPage(BaseModel):
     """LinkedIn company/page model"""
     __tablename__ = "linkedin_pages"
@@ -27,7 +45,7 @@ class LinkedInPage(BaseModel):
     # Company details
     description = Column(Text, nullable=True)
     website = Column(String(500), nullable=True)
-    industry = Column(String(255), nullable=True, index=True)
+    industry_id = Column(IndustryId, ForeignKey("industries.id"), nullable=True, index=True)
     
     # Metrics
     total_followers = Column(Integer, nullable=True, default=0)
@@ -38,6 +56,7 @@ class LinkedInPage(BaseModel):
     profile_image_url = Column(String(500), nullable=True)
     
     # Relationships
+    industry_ref = relationship("Industry", lazy="joined")
     users = relationship(
         "SocialMediaUser",
         back_populates="page",
@@ -55,9 +74,20 @@ class LinkedInPage(BaseModel):
     __table_args__ = (
         Index("idx_page_id", "page_id"),
         Index("idx_linkedin_internal_id", "linkedin_internal_id"),
-        Index("idx_name_industry", "name", "industry"),
+        Index("idx_name_industry", "name", "industry_id"),
+        # Industry filter + follower range/sort in one index range seek
+        Index("idx_industry_followers", "industry_id", "total_followers"),
     )
     
+    @property
+    def industry(self) -> Optional[str]:
+        """
+        Industry name (read-only)
+        Write through industry_ref, or pass 'industry' to LinkedInPageRepository.upsert
+        which resolves the name to a lookup row
+        """
+        return self.industry_ref.name if self.industry_ref is not None else None
+    
     def __repr__(self) -> str:
         return f"<LinkedInPage(id={self.id}, page_id='{self.page_id}', name='{self.name}')>"
 
@@ -177,3 +207,31 @@ class Comment(BaseModel):
     def __repr__(self) -> str:
         return f"<Comment(id={self.id}, comment_id='{self.comment_id}', post_id={self.post_id}, author='{self.author_name}')>"
 
+
+class PageSummary(BaseModel):
+    """AI-generated summary for a LinkedIn page (populated by batch backfills)"""
+    __tablename__ = "page_summaries"
+    
+    # Foreign key to LinkedInPage (one summary per page)
+    page_id = Column(
+        Integer,
+        ForeignKey("linkedin_pages.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+        index=True
+    )
+    
+    # Summary content
+    summary = Column(Text, nullable=False)
+    page_type = Column(String(50), nullable=True)
+    audience = Column(String(50), nullable=True)
+    engagement = Column(String(50), nullable=True)
+    
+    # OpenAI batch that produced this summary
+    batch_id = Column(String(100), nullable=True, index=True)
+    
+    # Relationships
+    page = relationship("LinkedInPage")
+    
+    def __repr__(self) -> str:
+        return f"<PageSummary(id={self.id}, page_id={self.page_id}, page_type='{self.page_type}')>"
@@ -3,6 +3,7 @@ Base schemas
 Common Pydantic schemas and configurations
 """
 from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict
 
 
@@ -197,6 +197,7 @@ class PaginatedResponseBase(BaseSchema):
     total_pages: int = Field(..., ge=0, description="Total number of pages")
     has_next: bool = Field(..., description="Whether there is a next page")
     has_previous: bool = Field(..., description="Whether there is a previous page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for fetching the next page by keyset")
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,7 +1,10 @@
 """Scraper module - LinkedIn profile scraping logic"""
 
 from linkedin_insights.scraper.page_scraper import LinkedInPageScraper
+from linkedin_insights.scraper.pool import ScraperPool, get_scraper_pool
 
 __all__ = [
     "LinkedInPageScraper",
+    "ScraperPool",
+    "get_scraper_pool",
 ]
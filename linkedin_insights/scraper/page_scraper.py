@@ -2,15 +2,17 @@
 LinkedIn Page Scraper using Playwright
 Scrapes LinkedIn company pages for page info, posts, comments, and employees
 """
+import asyncio
 import logging
 import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 
-from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 from playwright.async_api import BrowserContext
 
+from linkedin_insights.scraper.pool import get_scraper_pool
 from linkedin_insights.utils.config import settings
 
 logger = logging.getLogger(__name__)
@@ -25,68 +27,59 @@ class LinkedInPageScraper:
         self.headless = settings.SCRAPER_HEADLESS
         self.page_load_timeout = settings.SCRAPER_PAGE_LOAD_TIMEOUT
         self.navigation_timeout = settings.SCRAPER_NAVIGATION_TIMEOUT
-        self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
     
-    async def scrape_page(self, page_id: str) -> Dict[str, Any]:
+    async def scrape_page(self, page_id: str, context: Optional[BrowserContext] = None) -> Dict[str, Any]:
         """
         Scrape LinkedIn page by page ID
         
         Args:
             page_id: Last part of LinkedIn company URL (e.g., 'acme-corp' from linkedin.com/company/acme-corp)
+            context: Browser context to scrape in (checked out of the shared pool if omitted)
         
         Returns:
             Dictionary with page info, posts, comments, and employees
         """
+        if context is None:
+            try:
+                async with get_scraper_pool().acquire() as pooled_context:
+                    return await self.scrape_page(page_id, pooled_context)
+            except Exception as e:
+                logger.error(f"Error acquiring browser context for page {page_id}: {str(e)}", exc_info=True)
+                return self._create_error_response(f"Error scraping page: {str(e)}")
+        
         page_url = f"https://www.linkedin.com/company/{page_id}"
         logger.info(f"Scraping LinkedIn page: {page_url}")
         
+        page: Optional[Page] = None
         try:
-            async with async_playwright() as p:
-                # Launch browser
-                self.browser = await p.chromium.launch(
-                    headless=self.headless,
-                    args=['--no-sandbox', '--disable-blink-features=AutomationControlled']
-                )
-                
-                # Create context with realistic user agent
-                self.context = await self.browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                )
-                
-                page = await self.context.new_page()
-                page.set_default_timeout(self.page_load_timeout)
-                
-                # Navigate to page with retry logic
-                page_data = await self._navigate_with_retry(page, page_url)
-                
-                if not page_data:
-                    return self._create_error_response("Page not found or inaccessible")
-                
-                # Scrape page information
+            page = await context.new_page()
+            page.set_default_timeout(self.page_load_timeout)
+            
+            # Navigate to page with retry logic
+            page_data = await self._navigate_with_retry(page, page_url)
+            
+            if not page_data:
+                return self._create_error_response("Page not found or inaccessible")
+            
+            # Employees navigate in their own tab, so they run alongside; page info
+            # and posts both read (and scroll) this tab, so they run in turn
+            employees_task = asyncio.create_task(self._scrape_employees_in_new_page(context, page_id))
+            try:
                 page_info = await self._scrape_page_info(page, page_id, page_url)
-                
-                # Scrape posts
-                posts = await self._scrape_posts(page, limit=20)
-                
-                # Scrape comments for each post
-                for post in posts:
-                    post_id = post.get('post_id', '')
-                    comments = await self._scrape_post_comments(page, post_id, limit=10)
-                    post['comments'] = comments
-                
-                # Scrape employees
-                employees = await self._scrape_employees(page, page_id)
-                
-                await self.browser.close()
-                
-                return {
-                    'page_info': page_info,
-                    'posts': posts,
-                    'employees': employees,
-                    'scraped_at': datetime.utcnow().isoformat()
-                }
+                posts = await self._scrape_posts_with_comments(page)
+                employees = await employees_task
+            except BaseException:
+                employees_task.cancel()
+                # Wait for the cancellation so the employees tab is closed too
+                await asyncio.gather(employees_task, return_exceptions=True)
+                raise
+            
+            return {
+                'page_info': page_info,
+                'posts': posts,
+                'employees': employees,
+                'scraped_at': datetime.utcnow().isoformat()
+            }
         
         except PlaywrightTimeoutError as e:
             logger.error(f"Timeout error scraping page {page_id}: {str(e)}")
@@ -97,8 +90,11 @@ class LinkedInPageScraper:
             return self._create_error_response(f"Error scraping page: {str(e)}")
         
         finally:
-            if self.browser:
-                await self.browser.close()
+            if page:
+                try:
+                    await page.close()
+                except Exception as e:
+                    logger.warning(f"Error closing page for {page_id}: {str(e)}")
     
     async def _navigate_with_retry(self, page: Page, url: str) -> Optional[Dict[str, Any]]:
         """Navigate to page with retry logic"""
@@ -248,6 +244,18 @@ class LinkedInPageScraper:
                 'specialities': None
             }
     
+    async def _scrape_posts_with_comments(self, page: Page) -> List[Dict[str, Any]]:
+        """
+        Scrape posts, then each post's comments in turn
+        
+        Comments are expanded by clicking inside the post on this same tab, so
+        they are scraped one post at a time rather than concurrently.
+        """
+        posts = await self._scrape_posts(page, limit=20)
+        for post in posts:
+            post['comments'] = await self._scrape_post_comments(page, post.get('post_id', ''), limit=10)
+        return posts
+    
     async def _scrape_posts(self, page: Page, limit: int = 20) -> List[Dict[str, Any]]:
         """Scrape latest posts from the page"""
         posts = []
@@ -443,6 +451,15 @@ class LinkedInPageScraper:
         
         return comments[:limit]
     
+    async def _scrape_employees_in_new_page(self, context: BrowserContext, page_id: str) -> List[Dict[str, Any]]:
+        """Scrape employees in a separate tab, since it navigates away from the company page"""
+        employees_page = await context.new_page()
+        try:
+            employees_page.set_default_timeout(self.page_load_timeout)
+            return await self._scrape_employees(employees_page, page_id)
+        finally:
+            await employees_page.close()
+    
     async def _scrape_employees(self, page: Page, page_id: str) -> List[Dict[str, Any]]:
         """Scrape employees/people working at the company"""
         employees = []
@@ -0,0 +1,138 @@
+"""
+Playwright browser pool
+One shared browser with a pool of reusable browser contexts
+"""
+import asyncio
+import functools
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from linkedin_insights.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+
+class ScraperPool:
+    """
+    Shared Playwright browser with a fixed-size pool of browser contexts
+    
+    Launching Chromium is the expensive part of a scrape, so the browser is
+    started once and each scrape checks out a lightweight context instead.
+    Contexts are recycled after `max_uses_per_context` checkouts to bound
+    memory growth.
+    """
+    
+    def __init__(
+        self,
+        size: int = settings.SCRAPER_POOL_SIZE,
+        max_uses_per_context: int = settings.SCRAPER_MAX_USES_PER_CONTEXT,
+        headless: bool = settings.SCRAPER_HEADLESS
+    ):
+        self.size = size
+        self.max_uses_per_context = max_uses_per_context
+        self.headless = headless
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._contexts: "asyncio.Queue[Tuple[BrowserContext, int]]" = asyncio.Queue()
+        self._start_lock = asyncio.Lock()
+    
+    @property
+    def started(self) -> bool:
+        """Whether the browser is running"""
+        return self._browser is not None
+    
+    async def start(self) -> None:
+        """Launch the shared browser and create the context pool"""
+        async with self._start_lock:
+            if self.started:
+                return
+            
+            self._playwright = await async_playwright().start()
+            try:
+                self._browser = await self._playwright.chromium.launch(
+                    headless=self.headless,
+                    args=['--no-sandbox', '--disable-blink-features=AutomationControlled']
+                )
+                for _ in range(self.size):
+                    self._contexts.put_nowait((await self._new_context(), 0))
+            except Exception:
+                await self.stop()
+                raise
+            
+            logger.info(f"Scraper pool started with {self.size} browser contexts")
+    
+    async def stop(self) -> None:
+        """Close all contexts, the browser and Playwright"""
+        while not self._contexts.empty():
+            context, _ = self._contexts.get_nowait()
+            await self._close_context(context)
+        
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("Scraper pool stopped")
+    
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[BrowserContext]:
+        """
+        Check out a browser context for the duration of one scrape
+        
+        Starts the pool on first use if it wasn't started at app startup.
+        Waits when all contexts are in use.
+        """
+        if not self.started:
+            await self.start()
+        
+        context, uses = await self._contexts.get()
+        try:
+            yield context
+        finally:
+            await self._release(context, uses + 1)
+    
+    async def _release(self, context: BrowserContext, uses: int) -> None:
+        """Return a context to the pool, recycling it once it hits the use limit"""
+        if not self.started:
+            # Pool was stopped while this context was checked out
+            await self._close_context(context)
+            return
+        
+        if uses >= self.max_uses_per_context:
+            # Replace before closing so a failed launch keeps the pool full
+            try:
+                fresh_context = await self._new_context()
+                await self._close_context(context)
+                context, uses = fresh_context, 0
+            except Exception as e:
+                logger.error(f"Failed to recycle browser context: {str(e)}")
+        self._contexts.put_nowait((context, uses))
+    
+    async def _new_context(self) -> BrowserContext:
+        """Create a browser context with a realistic viewport and user agent"""
+        return await self._browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=USER_AGENT
+        )
+    
+    async def _close_context(self, context: BrowserContext) -> None:
+        """Close a context, ignoring errors from an already-dead browser"""
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context: {str(e)}")
+
+
+@functools.lru_cache(maxsize=1)
+def get_scraper_pool() -> ScraperPool:
+    """Get the process-wide scraper pool"""
+    return ScraperPool()
@@ -3,22 +3,204 @@ AI Summary Service
 Optional service for generating AI-powered summaries of LinkedIn pages
 Uses OpenAI API and gracefully degrades if not configured
 """
+import functools
+import json
 import logging
+import time
 from typing import Dict, Any, Optional
 import os
 
+import httpx
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
 from linkedin_insights.utils.config import settings
 
 logger = logging.getLogger(__name__)
 
 # Try to import OpenAI, but don't fail if not available
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     logger.warning("OpenAI package not installed. AI summary service will be disabled.")
 
+# Invariant instructions live in the system message and must stay byte-identical
+# across calls so OpenAI's automatic prompt-prefix cache can reuse them
+SYSTEM_PROMPT = (
+    "You are an expert analyst specializing in LinkedIn company page insights. "
+    "Provide concise, professional summaries focusing on page type, audience, and engagement.\n"
+    "\n"
+    "Analyze the LinkedIn company page statistics provided by the user and provide a brief summary.\n"
+    "Please provide a concise summary (2-3 sentences) covering:\n"
+    "1. Page type (e.g., enterprise, startup, agency)\n"
+    "2. Audience characteristics (size, likely demographics)\n"
+    "3. Engagement level and activity patterns\n"
+    "\n"
+    "Return a JSON object with the summary text together with the page_type, audience "
+    "and engagement classifications."
+)
+
+# Structured output schema: the model returns the categorical fields directly
+# instead of us keyword-matching them out of free-form prose
+SUMMARY_SCHEMA = {
+    "name": "PageSummary",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"},
+            "page_type": {"type": "string", "enum": ["Enterprise", "Startup", "Agency", "Non-Profit", "Business"]},
+            "audience": {"type": "string", "enum": ["Large", "Growing", "Niche", "Moderate"]},
+            "engagement": {"type": "string", "enum": ["High", "Moderate", "Low"]},
+        },
+        "required": ["summary", "page_type", "audience", "engagement"],
+        "additionalProperties": False,
+    },
+}
+
+# Model families that accept response_format={"type": "json_schema"}; anything
+# else (e.g. gpt-3.5-turbo) only gets JSON mode and the fields are checked here
+STRUCTURED_OUTPUT_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
+# Stable key so prefix-cache hits are shared across requests and tenants
+PROMPT_CACHE_KEY = "linkedin_page_summary_v1"
+
+# Endpoint used for Batch API requests (backfills)
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+def _response_format(model: str) -> Dict[str, Any]:
+    """Use strict structured outputs where the model supports them, JSON mode otherwise"""
+    if model.startswith(STRUCTURED_OUTPUT_MODEL_PREFIXES):
+        return {"type": "json_schema", "json_schema": SUMMARY_SCHEMA}
+    return {"type": "json_object"}
+
+
+def _parse_summary(content: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parse and validate the model's JSON summary
+    
+    Returns None for refusals, output cut off mid-object by max_tokens, and
+    objects missing any of the required string fields.
+    """
+    if not content:
+        return None
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    
+    required = SUMMARY_SCHEMA["schema"]["required"]
+    if not all(isinstance(data.get(field), str) and data[field] for field in required):
+        return None
+    return {field: data[field] for field in required}
+
+
+class CircuitOpenError(Exception):
+    """Raised when the OpenAI circuit breaker is open and calls are short-circuited"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Minimal consecutive-failure circuit breaker
+    
+    Opens after `fail_max` consecutive failures and rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through
+    (half-open) before closing again on success. Concurrent callers are
+    rejected while that trial call is in flight; a failed trial reopens
+    the circuit for another `reset_timeout`.
+    """
+    
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+    
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed (claims the probe slot when half-open)"""
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.reset_timeout or self.probe_in_flight:
+            return False
+        # Half-open: this caller is the single trial call
+        self.probe_in_flight = True
+        return True
+    
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        self.failure_count = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a failure and open the circuit once the threshold is hit"""
+        self.failure_count += 1
+        if self.probe_in_flight or self.failure_count >= self.fail_max:
+            self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+    
+    def release_probe(self) -> None:
+        """Free the half-open slot after a call that neither succeeded nor failed"""
+        self.probe_in_flight = False
+
+
+class _SafeDict(dict):
+    """format_map mapping that renders missing statistics as N/A"""
+    
+    def __missing__(self, key: str) -> str:
+        return "N/A"
+
+
+# Per-page statistics sent as the user message
+_PROMPT_TEMPLATE = (
+    "Statistics:\n"
+    "**Company Name:** {name}\n"
+    "**Industry:** {industry}\n"
+    "**Description:** {description}\n"
+    "**Total Followers:** {total_followers}\n"
+    "**Company Size:** {head_count}\n"
+    "**Total Posts:** {total_posts}\n"
+    "**Average Likes per Post:** {avg_likes}\n"
+    "**Average Comments per Post:** {avg_comments}\n"
+    "**Engagement Rate:** {engagement_rate}"
+)
+
+# Value formatting applied before filling _PROMPT_TEMPLATE
+_STAT_FORMATS = {
+    'industry': '{}',
+    'description': '{}',
+    'total_followers': '{:,}',
+    'head_count': '{:,} employees',
+    'total_posts': '{}',
+    'avg_likes': '{:.1f}',
+    'avg_comments': '{:.1f}',
+    'engagement_rate': '{:.2f}%',
+}
+
+
+def _is_circuit_failure(exc: BaseException) -> bool:
+    """Count only server errors, timeouts and connection failures against the breaker"""
+    if not OPENAI_AVAILABLE:
+        return False
+    if isinstance(exc, (APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+def _is_retryable_openai_error(exc: BaseException) -> bool:
+    """Retry only on rate limits, server errors and transport failures"""
+    if not OPENAI_AVAILABLE:
+        return False
+    if isinstance(exc, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
 
 class AISummaryService:
     """
@@ -32,12 +214,24 @@ class AISummaryService:
     def __init__(self):
         self.enabled = self._check_availability()
         self.client = None
+        self.circuit_breaker = CircuitBreaker(
+            fail_max=settings.OPENAI_CIRCUIT_FAIL_MAX,
+            reset_timeout=settings.OPENAI_CIRCUIT_RESET_TIMEOUT,
+        )
         
         if self.enabled:
             try:
                 api_key = os.getenv("OPENAI_API_KEY") or getattr(settings, "OPENAI_API_KEY", None)
                 if api_key:
-                    self.client = OpenAI(api_key=api_key)
+                    # Pooled keep-alive client so concurrent requests reuse TLS connections
+                    # Retries are handled by _call_openai so the circuit breaker sees them
+                    self.client = AsyncOpenAI(
+                        api_key=api_key,
+                        max_retries=0,
+                        http_client=httpx.AsyncClient(
+                            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+                        ),
+                    )
                     logger.info("AI Summary Service initialized successfully")
                 else:
                     self.enabled = False
@@ -54,7 +248,11 @@ class AISummaryService:
         api_key = os.getenv("OPENAI_API_KEY") or getattr(settings, "OPENAI_API_KEY", None)
         return api_key is not None
     
-    def generate_summary(self, page_stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def generate_summary(
+        self,
+        page_stats: Dict[str, Any],
+        max_tokens: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Generate AI summary for LinkedIn page statistics
         
@@ -69,6 +267,7 @@ class AISummaryService:
                 - avg_likes: Average likes per post
                 - avg_comments: Average comments per post
                 - engagement_rate: Engagement rate (optional)
+            max_tokens: Optional output token cap (defaults to OPENAI_MAX_TOKENS)
         
         Returns:
             Dictionary with summary or None if service is disabled
@@ -78,130 +277,211 @@ class AISummaryService:
             return None
         
         try:
-            # Prepare prompt
-            prompt = self._build_prompt(page_stats)
-            
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=getattr(settings, "OPENAI_MODEL", "gpt-3.5-turbo"),
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert analyst specializing in LinkedIn company page insights. "
-                                  "Provide concise, professional summaries focusing on page type, audience, and engagement."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=getattr(settings, "OPENAI_MAX_TOKENS", 300),
-                temperature=0.7
+            response = await self._call_openai(
+                **self._build_request_body(page_stats, max_tokens),
+                extra_body={"prompt_cache_key": PROMPT_CACHE_KEY}
             )
             
-            summary_text = response.choices[0].message.content.strip()
-            
-            # Parse and structure the summary
+            # Structured output already carries summary, page_type, audience and engagement
+            choice = response.choices[0]
+            if choice.finish_reason == "length":
+                logger.warning("AI summary truncated at max_tokens, discarding partial JSON")
+                return None
+            data = _parse_summary(choice.message.content)
+            if data is None:
+                logger.warning("AI summary response was not a valid summary object")
+                return None
             return {
-                "summary": summary_text,
-                "page_type": self._extract_page_type(summary_text),
-                "audience": self._extract_audience(summary_text),
-                "engagement": self._extract_engagement(summary_text),
+                **data,
                 "generated_at": page_stats.get("generated_at")
             }
         
+        except CircuitOpenError:
+            logger.warning("OpenAI circuit breaker open, skipping AI summary")
+            return None
+        
         except Exception as e:
             logger.error(f"Error generating AI summary: {str(e)}", exc_info=True)
             return None
     
-    def _build_prompt(self, page_stats: Dict[str, Any]) -> str:
-        """Build the prompt for OpenAI"""
-        prompt_parts = [
-            "Analyze the following LinkedIn company page statistics and provide a brief summary:",
-            "",
-            f"**Company Name:** {page_stats.get('name', 'Unknown')}",
-        ]
-        
-        if page_stats.get('industry'):
-            prompt_parts.append(f"**Industry:** {page_stats['industry']}")
-        
-        if page_stats.get('description'):
-            prompt_parts.append(f"**Description:** {page_stats['description']}")
-        
-        if page_stats.get('total_followers') is not None:
-            prompt_parts.append(f"**Total Followers:** {page_stats['total_followers']:,}")
-        
-        if page_stats.get('head_count') is not None:
-            prompt_parts.append(f"**Company Size:** {page_stats['head_count']:,} employees")
-        
-        if page_stats.get('total_posts') is not None:
-            prompt_parts.append(f"**Total Posts:** {page_stats['total_posts']}")
-        
-        if page_stats.get('avg_likes') is not None:
-            prompt_parts.append(f"**Average Likes per Post:** {page_stats['avg_likes']:.1f}")
-        
-        if page_stats.get('avg_comments') is not None:
-            prompt_parts.append(f"**Average Comments per Post:** {page_stats['avg_comments']:.1f}")
-        
-        if page_stats.get('engagement_rate') is not None:
-            prompt_parts.append(f"**Engagement Rate:** {page_stats['engagement_rate']:.2f}%")
-        
-        prompt_parts.extend([
-            "",
-            "Please provide a concise summary (2-3 sentences) covering:",
-            "1. Page type (e.g., enterprise, startup, agency)",
-            "2. Audience characteristics (size, likely demographics)",
-            "3. Engagement level and activity patterns"
-        ])
-        
-        return "\n".join(prompt_parts)
-    
-    def _extract_page_type(self, summary_text: str) -> Optional[str]:
-        """Extract page type from summary (simple keyword matching)"""
-        summary_lower = summary_text.lower()
-        
-        if any(word in summary_lower for word in ['enterprise', 'large', 'corporation', 'corporate']):
-            return "Enterprise"
-        elif any(word in summary_lower for word in ['startup', 'small', 'emerging']):
-            return "Startup"
-        elif any(word in summary_lower for word in ['agency', 'consulting', 'service']):
-            return "Agency"
-        elif any(word in summary_lower for word in ['non-profit', 'nonprofit', 'foundation']):
-            return "Non-Profit"
-        else:
-            return "Business"
-    
-    def _extract_audience(self, summary_text: str) -> Optional[str]:
-        """Extract audience description from summary"""
-        # Simple extraction - in production, could use more sophisticated NLP
-        if 'large audience' in summary_text.lower() or 'significant following' in summary_text.lower():
-            return "Large"
-        elif 'growing audience' in summary_text.lower() or 'moderate following' in summary_text.lower():
-            return "Growing"
-        elif 'niche' in summary_text.lower() or 'specialized' in summary_text.lower():
-            return "Niche"
-        else:
-            return "Moderate"
-    
-    def _extract_engagement(self, summary_text: str) -> Optional[str]:
-        """Extract engagement level from summary"""
-        summary_lower = summary_text.lower()
-        
-        if any(word in summary_lower for word in ['high engagement', 'strong engagement', 'active engagement']):
-            return "High"
-        elif any(word in summary_lower for word in ['moderate engagement', 'decent engagement']):
-            return "Moderate"
-        elif any(word in summary_lower for word in ['low engagement', 'limited engagement']):
-            return "Low"
+    async def _call_openai(self, **request: Any) -> Any:
+        """
+        Call chat completions with exponential backoff behind the circuit breaker
+        
+        Retries 429/5xx/transport errors up to 3 attempts. Only a final 5xx,
+        timeout or connection error counts against the breaker; client errors
+        and rate limits mean the API is up. While the breaker is open this
+        raises CircuitOpenError without touching the network.
+        """
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError()
+        
+        try:
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception(_is_retryable_openai_error),
+                wait=wait_exponential_jitter(initial=1, max=8),
+                stop=stop_after_attempt(3),
+                reraise=True,
+            ):
+                with attempt:
+                    response = await self.client.chat.completions.create(**request)
+        except Exception as e:
+            if _is_circuit_failure(e):
+                self.circuit_breaker.record_failure()
+            raise
         else:
-            return "Moderate"
+            self.circuit_breaker.record_success()
+        finally:
+            # No verdict (4xx, 429, cancellation): let the next caller probe
+            self.circuit_breaker.release_probe()
+        
+        return response
+    
+    async def enqueue_batch(self, stats_by_page: Dict[str, Dict[str, Any]]) -> Optional[str]:
+        """
+        Submit summary requests to the OpenAI Batch API
+        
+        Intended for non-interactive backfills: batch requests are billed at
+        half price in exchange for a completion window of up to 24 hours.
+        
+        Args:
+            stats_by_page: Mapping of LinkedIn page_id to page statistics
+                (same shape as generate_summary's page_stats)
+        
+        Returns:
+            OpenAI batch ID, or None if service is disabled or submission failed
+        """
+        if not self.enabled or not self.client or not stats_by_page:
+            return None
+        
+        try:
+            lines = []
+            for page_id, page_stats in stats_by_page.items():
+                body = self._build_request_body(page_stats)
+                body["prompt_cache_key"] = PROMPT_CACHE_KEY
+                lines.append(json.dumps({
+                    "custom_id": page_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": body,
+                }))
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+            
+            batch_file = await self.client.files.create(
+                file=("page_summaries.jsonl", payload),
+                purpose="batch"
+            )
+            batch = await self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h"
+            )
+            logger.info(f"Enqueued AI summary batch {batch.id} for {len(lines)} pages")
+            return batch.id
+        
+        except Exception as e:
+            logger.error(f"Error enqueueing AI summary batch: {str(e)}", exc_info=True)
+            return None
+    
+    async def retrieve_batch(self, batch_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Fetch results of a completed summary batch
+        
+        Args:
+            batch_id: OpenAI batch ID returned by enqueue_batch
+        
+        Returns:
+            Mapping of LinkedIn page_id to summary dictionary, or None if the
+            batch has not completed (or the service is disabled)
+        """
+        if not self.enabled or not self.client:
+            return None
+        
+        try:
+            batch = await self.client.batches.retrieve(batch_id)
+            if batch.status != "completed" or not batch.output_file_id:
+                logger.info(f"AI summary batch {batch_id} not ready (status: {batch.status})")
+                return None
+            
+            output = await self.client.files.content(batch.output_file_id)
+            results = {}
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    response = record.get("response") or {}
+                    if response.get("status_code") != 200:
+                        logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                        continue
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    summary = _parse_summary(content)
+                    if summary is None:
+                        logger.warning(f"Batch request {record.get('custom_id')} returned an invalid summary")
+                        continue
+                    results[record["custom_id"]] = summary
+                except (KeyError, IndexError, ValueError) as e:
+                    logger.warning(f"Skipping malformed batch result line: {str(e)}")
+                    continue
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"Error retrieving AI summary batch {batch_id}: {str(e)}", exc_info=True)
+            return None
+    
+    def _build_request_body(
+        self,
+        page_stats: Dict[str, Any],
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build the chat completion request body shared by live and batch calls"""
+        model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
+        return {
+            "model": model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": self._build_prompt(page_stats)
+                }
+            ],
+            "max_tokens": max_tokens or getattr(settings, "OPENAI_MAX_TOKENS", 200),
+            "temperature": 0.7,
+            "response_format": _response_format(model),
+        }
+    
+    def _build_prompt(self, page_stats: Dict[str, Any]) -> str:
+        """
+        Build the user prompt for OpenAI
+        
+        Only the per-page statistics go here; all instructions live in
+        SYSTEM_PROMPT so the shared prefix stays cacheable. Missing
+        statistics render as "N/A".
+        """
+        values = _SafeDict(name=page_stats.get('name') or 'Unknown')
+        for key, fmt in _STAT_FORMATS.items():
+            value = page_stats.get(key)
+            if value is not None and value != '':
+                values[key] = fmt.format(value)
+        
+        return _PROMPT_TEMPLATE.format_map(values)
     
     def is_enabled(self) -> bool:
         """Check if AI summary service is enabled"""
         return self.enabled
 
 
+@functools.lru_cache(maxsize=1)
 def get_ai_summary_service() -> AISummaryService:
-    """Factory function to get AI summary service instance"""
+    """
+    Factory function to get the process-wide AI summary service instance
+    
+    Cached so every request shares one OpenAI client and its connection pool.
+    """
     return AISummaryService()
 
@@ -4,7 +4,7 @@ Async service layer for processing and persisting scraped LinkedIn page data
 Follows SOLID principles and repository pattern
 """
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
@@ -14,14 +14,16 @@ from linkedin_insights.db.repositories import (
     PostRepository,
     CommentRepository,
     SocialMediaUserRepository,
+    PageSummaryRepository,
 )
 from linkedin_insights.models.linkedin import (
     LinkedInPage,
     Post,
     Comment,
     SocialMediaUser,
+    PageSummary,
 )
-from linkedin_insights.services.ai_summary_service import AISummaryService
+from linkedin_insights.services.ai_summary_service import get_ai_summary_service
 from linkedin_insights.utils.cache import invalidate_page_cache
 
 logger = logging.getLogger(__name__)
@@ -39,13 +41,18 @@ class LinkedInPageService:
         self.post_repo = PostRepository(Post, db)
         self.comment_repo = CommentRepository(Comment, db)
         self.user_repo = SocialMediaUserRepository(SocialMediaUser, db)
-        # Optional AI summary service
-        self.ai_summary_service = AISummaryService()
+        self.summary_repo = PageSummaryRepository(PageSummary, db)
+        # Optional AI summary service (shared process-wide instance)
+        self.ai_summary_service = get_ai_summary_service()
     
     async def process_scraped_data(self, scraped_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process and persist scraped LinkedIn page data
         
+        Everything is written in one transaction and committed once. Posts,
+        comments and employees are each written with bulk INSERT/UPDATE
+        statements in their own savepoint.
+        
         Args:
             scraped_data: Dictionary from scraper with page_info, posts, employees
         
@@ -76,15 +83,17 @@ class LinkedInPageService:
             employees_data = scraped_data.get('employees', [])
             employees_processed = await self._process_employees(employees_data, page.id)
             
-            # Final commit for any remaining changes
+            # Single commit for the whole unit of work
             await self.db.commit()
+            # Load server-side timestamps so the page can be serialized
+            await self.db.refresh(page)
             
             # Invalidate cache for this page
             await invalidate_page_cache(page.page_id)
             
             logger.info(
                 f"Successfully processed page {page.page_id}: "
-                f"{len(posts_processed)} posts, {len(employees_processed)} employees"
+                f"{len(posts_processed)} posts, {employees_processed} employees"
             )
             
             return {
@@ -92,7 +101,7 @@ class LinkedInPageService:
                 'page_id': page.id,
                 'page_page_id': page.page_id,
                 'posts_processed': len(posts_processed),
-                'employees_processed': len(employees_processed),
+                'employees_processed': employees_processed,
                 'processed_at': datetime.utcnow().isoformat()
             }
         
@@ -147,7 +156,7 @@ class LinkedInPageService:
             # Remove None values to avoid overwriting with None
             page_data = {k: v for k, v in page_data.items() if v is not None}
             
-            page = await self.page_repo.upsert(page_data)
+            page = await self.page_repo.upsert(page_data, commit=False)
             logger.debug(f"Upserted page: {page.page_id} (ID: {page.id})")
             return page
         
@@ -156,208 +165,142 @@ class LinkedInPageService:
             logger.error(f"Integrity error upserting page: {str(e)}")
             raise
     
-    async def _process_posts(self, posts_data: List[Dict[str, Any]], page_id: int) -> List[Any]:
+    async def _process_posts(self, posts_data: List[Dict[str, Any]], page_id: int) -> List[int]:
         """
         Process posts and their comments
-        Uses batch upsert for efficiency
+        Builds row dicts and writes them with bulk INSERT/UPDATE statements
         """
         if not posts_data:
             return []
         
-        processed_posts = []
+        post_rows = []
+        comments_by_post: Dict[str, List[Dict[str, Any]]] = {}
         
         for post_data in posts_data:
-            try:
-                # Extract comments before processing post
-                comments_data = post_data.pop('comments', [])
-                
-                # Prepare post data
-                post_dict = {
-                    'post_id': post_data.get('post_id'),
-                    'content': post_data.get('content'),
-                    'like_count': post_data.get('like_count', 0),
-                    'comment_count': post_data.get('comment_count', 0),
-                }
-                
-                # Parse posted_at timestamp
-                posted_at = post_data.get('posted_at')
-                if posted_at:
-                    if isinstance(posted_at, str):
-                        try:
-                            # Try parsing ISO format
-                            posted_at = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
-                        except:
-                            try:
-                                # Try parsing other formats
-                                posted_at = datetime.strptime(posted_at, '%Y-%m-%dT%H:%M:%S')
-                            except:
-                                posted_at = datetime.utcnow()
-                    post_dict['posted_at'] = posted_at
-                else:
-                    post_dict['posted_at'] = datetime.utcnow()
-                
-                # Remove None values
-                post_dict = {k: v for k, v in post_dict.items() if v is not None}
-                
-                # Upsert post
-                post = await self.post_repo.upsert(post_dict, page_id)
-                processed_posts.append(post)
-                
-                # Process comments for this post
-                if comments_data:
-                    await self._process_comments(comments_data, post.id)
+            post_id = post_data.get('post_id')
+            if not post_id:
+                logger.warning("Skipping post without post_id")
+                continue
             
-            except IntegrityError as e:
-                await self.db.rollback()
-                logger.warning(f"Integrity error processing post {post_data.get('post_id')}: {str(e)}")
-                # Retry once
-                try:
-                    post_dict = {
-                        'post_id': post_data.get('post_id'),
-                        'content': post_data.get('content'),
-                        'like_count': post_data.get('like_count', 0),
-                        'comment_count': post_data.get('comment_count', 0),
-                    }
-                    posted_at = post_data.get('posted_at')
-                    if posted_at and isinstance(posted_at, str):
-                        try:
-                            posted_at = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
-                        except:
-                            posted_at = datetime.utcnow()
-                    post_dict['posted_at'] = posted_at or datetime.utcnow()
-                    post_dict = {k: v for k, v in post_dict.items() if v is not None}
-                    post = await self.post_repo.upsert(post_dict, page_id)
-                    processed_posts.append(post)
-                    if comments_data:
-                        await self._process_comments(comments_data, post.id)
-                except Exception as retry_e:
-                    logger.error(f"Retry failed for post {post_data.get('post_id')}: {str(retry_e)}")
-                    continue
+            # Extract comments before processing post
+            comments_by_post[post_id] = post_data.pop('comments', [])
             
-            except Exception as e:
-                logger.warning(f"Error processing post {post_data.get('post_id')}: {str(e)}")
-                continue
+            post_dict = {
+                'post_id': post_id,
+                'content': post_data.get('content'),
+                'like_count': post_data.get('like_count', 0),
+                'comment_count': post_data.get('comment_count', 0),
+                'posted_at': self._parse_timestamp(post_data.get('posted_at')),
+            }
+            
+            # Remove None values
+            post_rows.append({k: v for k, v in post_dict.items() if v is not None})
         
-        return processed_posts
-    
-    async def _process_comments(self, comments_data: List[Dict[str, Any]], post_id: int) -> List[Any]:
-        """
-        Process comments for a post
-        Uses batch upsert for efficiency
-        """
-        if not comments_data:
+        post_ids = await self._bulk_write(
+            lambda: self.post_repo.bulk_upsert(post_rows, page_id),
+            'posts'
+        )
+        if not post_ids:
             return []
         
-        processed_comments = []
+        comment_rows = []
+        for post_id, comments_data in comments_by_post.items():
+            if post_id in post_ids:
+                comment_rows.extend(self._build_comment_rows(comments_data, post_ids[post_id]))
+        await self._process_comments(comment_rows)
+        
+        return list(post_ids.values())
+    
+    def _build_comment_rows(self, comments_data: List[Dict[str, Any]], post_id: int) -> List[Dict[str, Any]]:
+        """Build comment row dicts for a post, skipping comments missing required fields"""
+        comment_rows = []
         
         for comment_data in comments_data:
-            try:
-                # Prepare comment data
-                comment_dict = {
-                    'comment_id': comment_data.get('comment_id'),
-                    'author_name': comment_data.get('author_name'),
-                    'content': comment_data.get('content'),
-                }
-                
-                # Parse created_at timestamp
-                created_at = comment_data.get('created_at')
-                if created_at:
-                    if isinstance(created_at, str):
-                        try:
-                            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        except:
-                            created_at = datetime.utcnow()
-                    comment_dict['created_at'] = created_at
-                else:
-                    comment_dict['created_at'] = datetime.utcnow()
-                
-                # Remove None values
-                comment_dict = {k: v for k, v in comment_dict.items() if v is not None}
-                
-                # Upsert comment
-                comment = await self.comment_repo.upsert(comment_dict, post_id)
-                processed_comments.append(comment)
-            
-            except IntegrityError as e:
-                await self.db.rollback()
-                logger.warning(f"Integrity error processing comment {comment_data.get('comment_id')}: {str(e)}")
-                # Retry once
-                try:
-                    comment_dict = {
-                        'comment_id': comment_data.get('comment_id'),
-                        'author_name': comment_data.get('author_name'),
-                        'content': comment_data.get('content'),
-                    }
-                    created_at = comment_data.get('created_at')
-                    if created_at and isinstance(created_at, str):
-                        try:
-                            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        except:
-                            created_at = datetime.utcnow()
-                    comment_dict['created_at'] = created_at or datetime.utcnow()
-                    comment_dict = {k: v for k, v in comment_dict.items() if v is not None}
-                    comment = await self.comment_repo.upsert(comment_dict, post_id)
-                    processed_comments.append(comment)
-                except Exception as retry_e:
-                    logger.error(f"Retry failed for comment {comment_data.get('comment_id')}: {str(retry_e)}")
-                    continue
-            
-            except Exception as e:
-                logger.warning(f"Error processing comment {comment_data.get('comment_id')}: {str(e)}")
+            comment_dict = {
+                'comment_id': comment_data.get('comment_id'),
+                'post_id': post_id,
+                'author_name': comment_data.get('author_name'),
+                'content': comment_data.get('content'),
+                'created_at': self._parse_timestamp(comment_data.get('created_at')),
+            }
+            if not all(comment_dict.values()):
+                logger.warning(f"Skipping incomplete comment {comment_dict['comment_id']}")
                 continue
+            comment_rows.append(comment_dict)
         
-        return processed_comments
+        return comment_rows
     
-    async def _process_employees(self, employees_data: List[Dict[str, Any]], page_id: int) -> List[Any]:
+    async def _process_comments(self, comment_rows: List[Dict[str, Any]]) -> int:
+        """
+        Process comments for all posts
+        Writes them with bulk INSERT/UPDATE statements
+        """
+        if not comment_rows:
+            return 0
+        
+        return await self._bulk_write(
+            lambda: self.comment_repo.bulk_upsert(comment_rows),
+            'comments'
+        ) or 0
+    
+    async def _process_employees(self, employees_data: List[Dict[str, Any]], page_id: int) -> int:
         """
         Process employees/users
-        Uses batch upsert for efficiency
+        Builds row dicts and writes them with bulk INSERT/UPDATE statements
         """
         if not employees_data:
-            return []
+            return 0
         
-        processed_employees = []
+        user_rows = []
         
         for employee_data in employees_data:
-            try:
-                # Prepare user data
-                user_dict = {
-                    'linkedin_user_id': employee_data.get('linkedin_user_id'),
-                    'name': employee_data.get('name'),
-                    'title': employee_data.get('title'),
-                    'profile_url': employee_data.get('profile_url'),
-                }
-                
-                # Remove None values
-                user_dict = {k: v for k, v in user_dict.items() if v is not None}
-                
-                # Upsert user (unique constraint on linkedin_user_id + page_id)
-                user = await self.user_repo.upsert(user_dict, page_id)
-                processed_employees.append(user)
+            user_dict = {
+                'linkedin_user_id': employee_data.get('linkedin_user_id'),
+                'name': employee_data.get('name'),
+                'title': employee_data.get('title'),
+                'profile_url': employee_data.get('profile_url'),
+            }
+            if not (user_dict['linkedin_user_id'] and user_dict['name'] and user_dict['profile_url']):
+                logger.warning(f"Skipping incomplete employee {user_dict['linkedin_user_id']}")
+                continue
             
+            # Remove None values
+            user_rows.append({k: v for k, v in user_dict.items() if v is not None})
+        
+        return await self._bulk_write(
+            lambda: self.user_repo.bulk_upsert(user_rows, page_id),
+            'employees'
+        ) or 0
+    
+    async def _bulk_write(self, write: Callable[[], Awaitable[Any]], label: str) -> Any:
+        """
+        Run a bulk write in a savepoint, retrying once on IntegrityError
+        (e.g. a concurrent scrape inserted the same rows between SELECT and INSERT)
+        
+        Returns:
+            The write's result, or None if both attempts failed
+        """
+        for attempt in range(2):
+            try:
+                async with self.db.begin_nested():
+                    return await write()
             except IntegrityError as e:
-                await self.db.rollback()
-                logger.warning(f"Integrity error processing employee {employee_data.get('linkedin_user_id')}: {str(e)}")
-                # Retry once
-                try:
-                    user_dict = {
-                        'linkedin_user_id': employee_data.get('linkedin_user_id'),
-                        'name': employee_data.get('name'),
-                        'title': employee_data.get('title'),
-                        'profile_url': employee_data.get('profile_url'),
-                    }
-                    user_dict = {k: v for k, v in user_dict.items() if v is not None}
-                    user = await self.user_repo.upsert(user_dict, page_id)
-                    processed_employees.append(user)
-                except Exception as retry_e:
-                    logger.error(f"Retry failed for employee {employee_data.get('linkedin_user_id')}: {str(retry_e)}")
-                    continue
-            
+                logger.warning(f"Integrity error writing {label} (attempt {attempt + 1}): {str(e)}")
             except Exception as e:
-                logger.warning(f"Error processing employee {employee_data.get('linkedin_user_id')}: {str(e)}")
-                continue
-        
-        return processed_employees
+                logger.error(f"Error writing {label}: {str(e)}")
+                return None
+        return None
+    
+    def _parse_timestamp(self, value: Any) -> datetime:
+        """Parse a scraped ISO timestamp, falling back to now"""
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                pass
+        return datetime.utcnow()
     
     async def get_page_by_page_id(self, page_id: str) -> Optional[LinkedInPage]:
         """Get page by LinkedIn page_id"""
@@ -369,7 +312,7 @@ class LinkedInPageService:
         if not page:
             return None
         
-        # Load related data
+        # Sequential on the request's session: an AsyncSession runs one query at a time
         posts = await self.post_repo.get_by_page_id(page.id)
         employees = await self.user_repo.get_by_page_id(page.id)
         
@@ -393,6 +336,75 @@ class LinkedInPageService:
         if not page:
             return None
         
+        page_stats = await self._build_page_stats(page)
+        
+        # Generate AI summary
+        return await self.ai_summary_service.generate_summary(page_stats)
+    
+    async def enqueue_batch_summaries(self, page_ids: List[str]) -> Optional[str]:
+        """
+        Queue AI summaries for many pages via the OpenAI Batch API
+        
+        Use for non-interactive backfills; results are collected later with
+        collect_batch. Interactive callers should use generate_ai_summary.
+        
+        Args:
+            page_ids: LinkedIn page_ids to summarize
+        
+        Returns:
+            OpenAI batch ID or None if nothing was queued
+        """
+        stats_by_page = {}
+        for page_id in page_ids:
+            page = await self.page_repo.get_by_page_id(page_id)
+            if not page:
+                logger.warning(f"Skipping batch summary for unknown page {page_id}")
+                continue
+            stats_by_page[page.page_id] = await self._build_page_stats(page)
+        
+        return await self.ai_summary_service.enqueue_batch(stats_by_page)
+    
+    async def collect_batch(self, batch_id: str) -> int:
+        """
+        Persist results of a completed summary batch to page_summaries
+        
+        Args:
+            batch_id: OpenAI batch ID returned by enqueue_batch_summaries
+        
+        Returns:
+            Number of summaries stored (0 if the batch is not complete yet)
+        """
+        results = await self.ai_summary_service.retrieve_batch(batch_id)
+        if not results:
+            return 0
+        
+        stored = 0
+        for page_id, summary_data in results.items():
+            page = await self.page_repo.get_by_page_id(page_id)
+            if not page:
+                continue
+            try:
+                await self.summary_repo.upsert(
+                    {
+                        'summary': summary_data.get('summary'),
+                        'page_type': summary_data.get('page_type'),
+                        'audience': summary_data.get('audience'),
+                        'engagement': summary_data.get('engagement'),
+                        'batch_id': batch_id,
+                    },
+                    page.id
+                )
+                stored += 1
+            except SQLAlchemyError as e:
+                await self.db.rollback()
+                logger.warning(f"Error storing batch summary for page {page_id}: {str(e)}")
+                continue
+        
+        logger.info(f"Stored {stored} summaries from batch {batch_id}")
+        return stored
+    
+    async def _build_page_stats(self, page: LinkedInPage) -> Dict[str, Any]:
+        """Build the statistics dictionary used for AI summaries"""
         # Get posts for engagement metrics
         posts = await self.post_repo.get_by_page_id(page.id, limit=100)
         
@@ -408,8 +420,7 @@ class LinkedInPageService:
         if page.total_followers and page.total_followers > 0:
             engagement_rate = ((avg_likes + avg_comments) / page.total_followers) * 100
         
-        # Prepare page stats
-        page_stats = {
+        return {
             'name': page.name,
             'industry': page.industry,
             'total_followers': page.total_followers,
@@ -421,6 +432,3 @@ class LinkedInPageService:
             'engagement_rate': engagement_rate,
             'generated_at': datetime.utcnow().isoformat()
         }
-        
-        # Generate AI summary
-        return self.ai_summary_service.generate_summary(page_stats)
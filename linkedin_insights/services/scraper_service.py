@@ -2,13 +2,23 @@
 Scraper Service Wrapper
 Async wrapper for Playwright scraper
 """
+import asyncio
 import logging
 from typing import Dict, Any
 
 from linkedin_insights.scraper.page_scraper import LinkedInPageScraper
+from linkedin_insights.scraper.pool import get_scraper_pool
+from linkedin_insights.utils.concurrent_limiter import concurrent_limit
+from linkedin_insights.utils.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Global (all workers) in-flight scrape tracking key
+ACTIVE_SCRAPES_KEY = "scraper:active"
+
+# Per-process cap on concurrent scrapes; extra callers wait for a slot
+_scrape_semaphore = asyncio.Semaphore(settings.SCRAPER_MAX_CONCURRENCY)
+
 
 class ScraperService:
     """Async service wrapper for LinkedIn page scraper"""
@@ -25,9 +35,25 @@ class ScraperService:
         
         Returns:
             Dictionary with page info, posts, comments, and employees
+        
+        Raises:
+            ConcurrencyLimitExceeded: If SCRAPER_GLOBAL_MAX_CONCURRENCY scrapes
+                are already running across all workers
         """
+        # Wait for a local slot first so queued callers don't hold global slots
+        async with _scrape_semaphore:
+            async with concurrent_limit(
+                ACTIVE_SCRAPES_KEY,
+                settings.SCRAPER_GLOBAL_MAX_CONCURRENCY,
+                settings.SCRAPER_SLOT_TIMEOUT
+            ):
+                return await self._scrape(page_id)
+    
+    async def _scrape(self, page_id: str) -> Dict[str, Any]:
+        """Scrape a page in a pooled browser context, converting errors to an error response"""
         try:
-            return await self.scraper.scrape_page(page_id)
+            async with get_scraper_pool().acquire() as context:
+                return await self.scraper.scrape_page(page_id, context)
         except Exception as e:
             logger.error(f"Error in scraper service: {str(e)}", exc_info=True)
             return {
@@ -3,8 +3,10 @@
 from linkedin_insights.utils.pagination import (
     PaginationParams,
     PaginationResult,
+    KeysetPaginationResult,
     paginate_query,
     paginate_query_with_filters,
+    paginate_query_keyset,
     create_pagination_metadata,
     get_pagination_dependency,
 )
@@ -12,8 +14,10 @@ from linkedin_insights.utils.pagination import (
 __all__ = [
     "PaginationParams",
     "PaginationResult",
+    "KeysetPaginationResult",
     "paginate_query",
     "paginate_query_with_filters",
+    "paginate_query_keyset",
     "create_pagination_metadata",
     "get_pagination_dependency",
 ]
@@ -2,26 +2,68 @@
 Caching decorators and utilities
 Decorator-based caching for FastAPI endpoints
 """
+import asyncio
 import functools
-import hashlib
-import json
 import logging
-from typing import Callable, Any, Optional, TypeVar, ParamSpec
-from fastapi import Request
+import time
+import uuid
+import weakref
+from typing import Callable, Any, Dict, Optional, Tuple, TypeVar, ParamSpec
 
-from linkedin_insights.utils.redis_client import get_cache, set_cache, delete_cache
-from linkedin_insights.utils.config import settings
+import blake3
+import msgpack
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from linkedin_insights.utils.redis_client import (
+    get_cache,
+    set_cache,
+    delete_cache,
+    get_and_touch,
+    get_or_reserve,
+    release_lock,
+)
+from linkedin_insights.utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 P = ParamSpec('P')
 R = TypeVar('R')
 
+# Per-process locks keyed by cache key so concurrent misses in one worker
+# coalesce without a Redis round-trip
+_local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# Background stale-while-revalidate refreshes, keyed by cache key. Holding the
+# task here keeps it alive and stops duplicate refreshes of the same key.
+_pending_refreshes: Dict[str, asyncio.Task] = {}
+
+# Freshness policies: (fresh seconds, extra seconds a stale value may be served)
+CACHE_POLICIES: Dict[str, Tuple[int, int]] = {
+    "short": (60, 300),
+    "normal": (300, 3600),
+    "long": (3600, 86400),
+}
+
+
+def _normalize_key_arg(value: Any) -> Any:
+    """Replace values that don't serialize stably (e.g. FastAPI requests, DB sessions)"""
+    if isinstance(value, Request):
+        return (value.method, value.url.path, tuple(sorted(value.query_params.multi_items())))
+    if isinstance(value, AsyncSession):
+        return None
+    return value
+
 
 def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     """
     Generate cache key from prefix and arguments
     
+    Arguments are packed with msgpack and hashed with BLAKE3, both of which
+    run in C rather than Python-level JSON reflection.
+    
     Args:
         prefix: Cache key prefix
         *args: Positional arguments
@@ -30,37 +72,67 @@ def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     Returns:
         Cache key string
     """
-    # Create a hash of the arguments
     key_data = {
-        'args': args,
-        'kwargs': kwargs
+        'a': [_normalize_key_arg(arg) for arg in args],
+        'k': sorted((key, _normalize_key_arg(value)) for key, value in kwargs.items()),
     }
-    key_str = json.dumps(key_data, sort_keys=True, default=str)
-    key_hash = hashlib.md5(key_str.encode()).hexdigest()
-    return f"{prefix}:{key_hash}"
+    buf = msgpack.packb(key_data, default=str, use_bin_type=True)
+    return f"{prefix}:{blake3.blake3(buf).hexdigest(16)}"
 
 
 def cache_response(
     ttl: Optional[int] = None,
     key_prefix: Optional[str] = None,
-    include_request: bool = False
+    include_request: bool = False,
+    policy: Optional[str] = None,
+    sliding_ttl: bool = False,
+    enable_dogpile_prevention: bool = True,
+    dogpile_wait_time: float = 0.1,
+    dogpile_max_wait: float = 5.0,
+    raw: bool = False,
+    session_factory: Optional[Callable[[], AsyncSession]] = None
 ):
     """
     Decorator to cache async function responses
     
+    The result is encoded to JSON once, when it is computed, and cached as
+    bytes alongside its `stale_at` time. Hits are returned as a FastAPI
+    `Response` wrapping those bytes, so nothing is re-encoded per request
+    (note this bypasses the endpoint's `response_model`).
+    
+    Until `stale_at` the body is served as-is; after it (and until the key's
+    hard TTL) the stale body is served immediately while a background task
+    recomputes it. If that refresh fails, the stale body keeps being served.
+    The refresh outlives the request, so any `AsyncSession` argument is
+    swapped for a new session from `session_factory` for that call.
+    
     Args:
-        ttl: Time to live in seconds (defaults to REDIS_CACHE_TTL)
+        ttl: Seconds an entry is fresh (defaults to the policy's value, or REDIS_CACHE_TTL)
         key_prefix: Cache key prefix (defaults to function name)
         include_request: Whether to include request in cache key (for FastAPI endpoints)
+        policy: Freshness policy - "short", "normal" or "long" (see CACHE_POLICIES).
+            Without a policy entries expire as soon as they go stale.
+        sliding_ttl: Refresh the TTL on every hit (GET + EXPIRE pipelined in one round trip)
+        enable_dogpile_prevention: Let only one caller compute a missing key
+            while concurrent callers wait for the cached result
+        dogpile_wait_time: Seconds between cache polls while waiting
+        dogpile_max_wait: Max seconds to wait (and lock TTL) before computing anyway
+        raw: Return the decoded Python object instead of a `Response`
+            (for non-endpoint callers)
+        session_factory: Opens the session used by background refreshes
+            (defaults to AsyncSessionLocal)
     
     Usage:
         ```python
-        @cache_response(ttl=300, key_prefix="page")
+        @cache_response(key_prefix="page", policy="normal")
         async def get_page(page_id: str):
             # Function implementation
             return page_data
         ```
     """
+    if policy is not None and policy not in CACHE_POLICIES:
+        raise ValueError(f"Unknown cache policy '{policy}'. Expected one of: {', '.join(CACHE_POLICIES)}")
+    
     def decorator(func: Callable[P, R]) -> Callable[P, R]:
         @functools.wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
@@ -79,27 +151,177 @@ def cache_response(
             
             # Generate cache key
             cache_key = generate_cache_key(prefix, *args, **kwargs)
+            fresh_ttl, hard_ttl = _resolve_ttls(ttl, policy)
+            
+            async def compute_entry(call_args: Tuple = args, call_kwargs: Dict[str, Any] = kwargs) -> bytes:
+                result = await func(*call_args, **call_kwargs)
+                entry = _pack_entry(orjson.dumps(jsonable_encoder(result)), time.time() + fresh_ttl)
+                await set_cache(cache_key, entry, hard_ttl, serialized=True)
+                return entry
+            
+            async def refresh_entry() -> bytes:
+                # The request's session is closed by the time this runs
+                async with (session_factory or _default_session_factory())() as db:
+                    return await compute_entry(
+                        tuple(db if isinstance(arg, AsyncSession) else arg for arg in args),
+                        {key: db if isinstance(value, AsyncSession) else value for key, value in kwargs.items()},
+                    )
             
             # Try to get from cache
-            cached_value = await get_cache(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return cached_value
+            if sliding_ttl:
+                entry = await get_and_touch(cache_key, hard_ttl, serialized=True)
+            else:
+                entry = await get_cache(cache_key, serialized=True)
+            unpacked = _unpack_entry(entry) if entry is not None else None
+            if unpacked is not None:
+                stale_at, body = unpacked
+                if time.time() >= stale_at:
+                    logger.debug(f"Serving stale value for key: {cache_key}")
+                    _schedule_refresh(cache_key, refresh_entry)
+                else:
+                    logger.debug(f"Cache hit for key: {cache_key}")
+                return _make_response(body, raw)
+            
+            if entry is not None:
+                # Unrecognised (e.g. older format) entry - drop it and treat as a miss
+                logger.debug(f"Discarding unrecognised cache entry for key: {cache_key}")
+                await delete_cache(cache_key)
             
             # Cache miss - execute function
             logger.debug(f"Cache miss for key: {cache_key}")
-            result = await func(*args, **kwargs)
-            
-            # Store in cache
-            cache_ttl = ttl or settings.REDIS_CACHE_TTL
-            await set_cache(cache_key, result, cache_ttl)
-            
-            return result
+            if not enable_dogpile_prevention:
+                entry = await compute_entry()
+            else:
+                async with _get_local_lock(cache_key):
+                    entry = await _compute_single_flight(
+                        cache_key,
+                        compute_entry,
+                        dogpile_wait_time,
+                        dogpile_max_wait,
+                    )
+            unpacked = _unpack_entry(entry)
+            if unpacked is None:
+                # Another writer published an unrecognised entry meanwhile
+                entry = await compute_entry()
+                unpacked = _unpack_entry(entry)
+            return _make_response(unpacked[1], raw)
         
         return wrapper
     return decorator
 
 
+def _resolve_ttls(ttl: Optional[int], policy: Optional[str]) -> Tuple[int, int]:
+    """Return (fresh TTL, hard TTL) in seconds for a ttl/policy pair"""
+    if policy is None:
+        fresh_ttl = ttl or get_settings().REDIS_CACHE_TTL
+        return fresh_ttl, fresh_ttl
+    
+    policy_fresh, stale_window = CACHE_POLICIES[policy]
+    fresh_ttl = ttl or policy_fresh
+    return fresh_ttl, fresh_ttl + stale_window
+
+
+def _default_session_factory() -> Callable[[], AsyncSession]:
+    """Session factory for background refreshes (imported lazily to avoid a cycle)"""
+    from linkedin_insights.db.base import AsyncSessionLocal
+    return AsyncSessionLocal
+
+
+def _pack_entry(body: bytes, stale_at: float) -> bytes:
+    """Prefix encoded JSON with its stale-at time (compact JSON has no raw newlines)"""
+    return repr(stale_at).encode() + b"\n" + body
+
+
+def _unpack_entry(entry: bytes) -> Optional[Tuple[float, bytes]]:
+    """
+    Split a cached entry into (stale_at, encoded JSON body)
+    
+    Returns None for entries not written by _pack_entry (e.g. an older
+    format); callers treat those as a miss.
+    """
+    stale_at, _, body = entry.partition(b"\n")
+    try:
+        return float(stale_at), body
+    except ValueError:
+        return None
+
+
+def _make_response(body: bytes, raw: bool) -> Any:
+    """Wrap encoded JSON in a Response, or decode it for raw callers"""
+    if raw:
+        return orjson.loads(body)
+    return Response(content=body, media_type="application/json")
+
+
+def _get_local_lock(cache_key: str) -> asyncio.Lock:
+    """Get (or create) the in-process lock for a cache key"""
+    lock = _local_locks.get(cache_key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _local_locks[cache_key] = lock
+    return lock
+
+
+def _schedule_refresh(cache_key: str, compute_entry: Callable[[], Any]) -> None:
+    """Start a background refresh of a stale key unless one is already running"""
+    pending = _pending_refreshes.get(cache_key)
+    if pending is not None and not pending.done():
+        return
+    
+    task = asyncio.create_task(_refresh(cache_key, compute_entry))
+    _pending_refreshes[cache_key] = task
+    task.add_done_callback(lambda _: _pending_refreshes.pop(cache_key, None))
+
+
+async def _refresh(cache_key: str, compute_entry: Callable[[], Any]) -> None:
+    """Recompute a stale entry, keeping the stale value if the refresh fails"""
+    async with _get_local_lock(cache_key):
+        try:
+            await compute_entry()
+            logger.debug(f"Refreshed stale cache key: {cache_key}")
+        except Exception as e:
+            logger.warning(f"Background refresh failed for key {cache_key}, serving stale value: {str(e)}")
+
+
+async def _compute_single_flight(
+    cache_key: str,
+    compute_entry: Callable[[], Any],
+    wait_time: float,
+    max_wait: float
+) -> bytes:
+    """
+    Compute a missing cache entry with a cross-process Redis lock
+    
+    The re-check and lock acquisition happen in one atomic Redis script. The
+    lock winner computes and publishes the entry; other workers poll the
+    cache until the entry appears or max_wait elapses, then compute anyway.
+    """
+    lock_key = f"{cache_key}:lock"
+    token = uuid.uuid4().hex
+    
+    # Another caller may have filled the key while we waited on the local lock
+    entry, acquired = await get_or_reserve(cache_key, lock_key, token, int(max_wait * 1000), serialized=True)
+    if entry is not None:
+        return entry
+    
+    if not acquired:
+        # Another worker is computing - wait for it to publish the entry
+        deadline = time.monotonic() + max_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(wait_time)
+            entry = await get_cache(cache_key, serialized=True)
+            if entry is not None:
+                logger.debug(f"Cache filled by lock holder for key: {cache_key}")
+                return entry
+        logger.debug(f"Timed out waiting for cache lock {lock_key}, computing")
+    
+    try:
+        return await compute_entry()
+    finally:
+        if acquired:
+            await release_lock(lock_key, token)
+
+
 def invalidate_cache(key_pattern: str):
     """
     Decorator to invalidate cache after function execution
@@ -169,11 +391,15 @@ def get_cache_key_for_pages_list(filters: dict) -> str:
     return generate_cache_key("pages:list", **filters)
 
 
-def get_cache_key_for_page_posts(page_id: str, page: int, page_size: int) -> str:
-    """Get cache key for page posts"""
+@functools.lru_cache(maxsize=8192)
+def get_cache_key_for_page_posts(page_id: str, page: int, page_size: int, cursor: Optional[str] = None) -> str:
+    """Get cache key for page posts (keyed by cursor for keyset pages)"""
+    if cursor:
+        return f"pages:{page_id}:posts:cursor:{cursor}:{page_size}"
     return f"pages:{page_id}:posts:{page}:{page_size}"
 
 
+@functools.lru_cache(maxsize=8192)
 def get_cache_key_for_page_followers(page_id: str, page: int, page_size: int) -> str:
     """Get cache key for page followers"""
     return f"pages:{page_id}:followers:{page}:{page_size}"
@@ -0,0 +1,76 @@
+"""
+Concurrent request limiter
+Redis sorted-set limiter bounding in-flight work across all workers
+"""
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from linkedin_insights.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Drop stragglers, then take a slot if fewer than the limit are in flight.
+# KEYS[1]=set key, ARGV[1]=now (ms), ARGV[2]=slot timeout (ms), ARGV[3]=limit, ARGV[4]=member
+ACQUIRE_SLOT_SCRIPT = """
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ARGV[1] - ARGV[2])
+if redis.call("ZCARD", KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call("ZADD", KEYS[1], ARGV[1], ARGV[4])
+redis.call("PEXPIRE", KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when the global number of in-flight requests is at its limit"""
+
+
+@asynccontextmanager
+async def concurrent_limit(key: str, limit: int, timeout: int) -> AsyncIterator[None]:
+    """
+    Hold one of `limit` global slots for the duration of the block
+    
+    Each holder is a member of a Redis sorted set scored by its start time.
+    Members older than `timeout` seconds (e.g. from a crashed worker) are
+    evicted before counting. Without Redis the limiter is a no-op.
+    
+    Args:
+        key: Sorted set key (e.g. "scraper:active")
+        limit: Max concurrent holders across all workers
+        timeout: Seconds after which a slot is considered abandoned
+    
+    Raises:
+        ConcurrencyLimitExceeded: If all slots are taken
+    """
+    client = await get_redis_client()
+    if client is None:
+        yield
+        return
+    
+    member = uuid.uuid4().hex
+    try:
+        acquire_slot = client.register_script(ACQUIRE_SLOT_SCRIPT)
+        acquired = await acquire_slot(
+            keys=[key],
+            args=[int(time.time() * 1000), timeout * 1000, limit, member]
+        )
+    except Exception as e:
+        # Fail open - the per-process limits still apply
+        logger.error(f"Error acquiring concurrency slot {key}: {str(e)}")
+        yield
+        return
+    
+    if not acquired:
+        raise ConcurrencyLimitExceeded(f"Too many concurrent requests for {key} (limit {limit})")
+    
+    try:
+        yield
+    finally:
+        try:
+            await client.zrem(key, member)
+        except Exception as e:
+            logger.error(f"Error releasing concurrency slot {key}: {str(e)}")
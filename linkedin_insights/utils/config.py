@@ -2,7 +2,9 @@
 Configuration management using Pydantic BaseSettings
 Centralized application configuration
 """
+from functools import lru_cache
 from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -28,11 +30,18 @@ class Settings(BaseSettings):
     SCRAPER_HEADLESS: bool = True
     SCRAPER_PAGE_LOAD_TIMEOUT: int = 60000  # milliseconds
     SCRAPER_NAVIGATION_TIMEOUT: int = 30000  # milliseconds
+    SCRAPER_POOL_SIZE: int = 4  # browser contexts sharing one browser
+    SCRAPER_MAX_USES_PER_CONTEXT: int = 50  # scrapes before a context is recycled
+    SCRAPER_MAX_CONCURRENCY: int = 4  # concurrent scrapes per worker
+    SCRAPER_GLOBAL_MAX_CONCURRENCY: int = 16  # concurrent scrapes across all workers (needs Redis)
+    SCRAPER_SLOT_TIMEOUT: int = 300  # seconds before an abandoned global slot is reclaimed
     
     # AI Summary (Optional)
     OPENAI_API_KEY: Optional[str] = None
-    OPENAI_MODEL: str = "gpt-3.5-turbo"
-    OPENAI_MAX_TOKENS: int = 300
+    OPENAI_MODEL: str = "gpt-4o-mini"  # supports json_schema structured outputs
+    OPENAI_MAX_TOKENS: int = 200  # 2-3 sentence summary plus the JSON envelope
+    OPENAI_CIRCUIT_FAIL_MAX: int = 5  # consecutive failures before failing fast
+    OPENAI_CIRCUIT_RESET_TIMEOUT: int = 30  # seconds
     
     # Redis (Optional)
     REDIS_URL: Optional[str] = None
@@ -41,6 +50,7 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
     REDIS_CACHE_TTL: int = 300  # 5 minutes default
+    REDIS_POOL_SIZE: int = 32  # max pooled connections (at least 32)
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -49,5 +59,16 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, parsed once per process
+    
+    Call `get_settings.cache_clear()` to re-read the environment (e.g. in tests).
+    """
+    return Settings()
+
+
+# Backwards-compatible module-level instance
+settings = get_settings()
 
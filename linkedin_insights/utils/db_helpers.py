@@ -0,0 +1,32 @@
+"""
+Database helpers
+Session utilities shared by repositories and services
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Type
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def bulk_refresh(session: AsyncSession, objs: Iterable[Any]) -> None:
+    """
+    Refresh many ORM objects with one SELECT per model instead of one per object
+    
+    Rows are loaded with populate_existing, so the objects already in the
+    session's identity map are overwritten in place.
+    
+    Args:
+        session: AsyncSession the objects belong to
+        objs: Persisted ORM objects with an `id` primary key
+    """
+    ids_by_model: Dict[Type[Any], List[int]] = defaultdict(list)
+    for obj in objs:
+        ids_by_model[type(obj)].append(obj.id)
+    
+    for model, ids in ids_by_model.items():
+        await session.execute(
+            select(model)
+            .where(model.id.in_(ids))
+            .execution_options(populate_existing=True)
+        )
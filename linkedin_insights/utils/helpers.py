@@ -3,7 +3,9 @@ Helper utilities and common functions
 Shared utility functions across the application
 """
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Union
+
+from pydantic import BaseModel
 
 
 def format_datetime(dt: datetime) -> str:
@@ -11,7 +13,15 @@ def format_datetime(dt: datetime) -> str:
     return dt.isoformat()
 
 
-def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Remove None values from dictionary"""
+def sanitize_dict(data: Union[Dict[str, Any], BaseModel]) -> Dict[str, Any]:
+    """
+    Remove None values from dictionary
+    
+    Legacy shim: routes should set `response_model_exclude_none=True` instead.
+    Pydantic models passed here are dumped with `exclude_none=True` so the
+    filtering runs in pydantic-core rather than a Python loop.
+    """
+    if isinstance(data, BaseModel):
+        return data.model_dump(exclude_none=True, by_alias=True)
     return {k: v for k, v in data.items() if v is not None}
 
@@ -3,31 +3,75 @@ Logging configuration and setup
 Structured logging with appropriate handlers
 """
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Optional
 
-from linkedin_insights.utils.config import settings
+from linkedin_insights.utils.config import get_settings
+
+# Records are enqueued on the calling thread and formatted and written to
+# stdout/file by a background listener thread, so neither formatting nor disk
+# I/O runs on the event loop
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+
+
+class _PassThroughQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as-is
+    
+    The stock prepare() formats the message and traceback on the calling
+    thread so records can be pickled; the listener is a thread in this
+    process, so the target handlers' formatters do that work instead.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
 def setup_logging() -> None:
-    """Configure application logging"""
-    log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+    """Configure application logging (idempotent; restarts the listener after shutdown)"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_level = getattr(logging, get_settings().LOG_LEVEL.upper(), logging.INFO)
     
     # Create logs directory
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    # Configure root logger
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_dir / "app.log"),
-        ],
-    )
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    handlers = [
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler(log_dir / "app.log"),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # Configure root logger to only enqueue records
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    if not any(isinstance(handler, QueueHandler) for handler in root_logger.handlers):
+        root_logger.addHandler(_PassThroughQueueHandler(_log_queue))
+    
+    _listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
     
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener"""
+    global _listener
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
@@ -2,10 +2,16 @@
 Pagination utilities for FastAPI
 Reusable pagination helpers for SQLAlchemy queries
 """
-from typing import TypeVar, Generic, List, Dict, Any, Optional
-from fastapi import Query
+import base64
+import binascii
+from datetime import datetime
+from typing import TypeVar, Generic, List, Dict, Any, Optional, Tuple
+
+import orjson
+from fastapi import Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, and_, or_, DateTime
+from sqlalchemy.sql import operators
 
 from linkedin_insights.schemas.linkedin import PaginatedResponseBase
 
@@ -18,10 +24,12 @@ class PaginationParams:
     def __init__(
         self,
         page: int = Query(1, ge=1, description="Page number"),
-        page_size: int = Query(20, ge=1, le=100, description="Items per page")
+        page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous response")
     ):
         self.page = page
         self.page_size = page_size
+        self.cursor = cursor
     
     @property
     def skip(self) -> int:
@@ -42,29 +50,18 @@ class PaginationResult(Generic[T]):
         items: List[T],
         total_count: int,
         page: int,
-        page_size: int
+        page_size: int,
+        next_cursor: Optional[str] = None
     ):
         self.items = items
         self.total_count = total_count
         self.page = page
         self.page_size = page_size
-    
-    @property
-    def total_pages(self) -> int:
-        """Calculate total pages"""
-        if self.total_count == 0:
-            return 0
-        return (self.total_count + self.page_size - 1) // self.page_size
-    
-    @property
-    def has_next(self) -> bool:
-        """Check if there is a next page"""
-        return self.page < self.total_pages
-    
-    @property
-    def has_previous(self) -> bool:
-        """Check if there is a previous page"""
-        return self.page > 1
+        self.next_cursor = next_cursor
+        # Derived metadata is computed once here rather than on every access
+        self.total_pages = (total_count + page_size - 1) // page_size if total_count else 0
+        self.has_next = page < self.total_pages
+        self.has_previous = page > 1
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API response"""
@@ -76,9 +73,27 @@ class PaginationResult(Generic[T]):
             'total_pages': self.total_pages,
             'has_next': self.has_next,
             'has_previous': self.has_previous,
+            'next_cursor': self.next_cursor,
         }
 
 
+class KeysetPaginationResult(PaginationResult[T]):
+    """Pagination result for keyset (cursor) pages, where page numbers don't apply"""
+    
+    def __init__(
+        self,
+        items: List[T],
+        total_count: int,
+        page: int,
+        page_size: int,
+        next_cursor: Optional[str] = None
+    ):
+        super().__init__(items, total_count, page, page_size, next_cursor)
+        self.has_next = next_cursor is not None
+        # Keyset pages are always reached from an earlier page
+        self.has_previous = True
+
+
 async def paginate_query(
     query: select,
     db: AsyncSession,
@@ -112,18 +127,29 @@ async def paginate_query(
     if page_size > 100:
         page_size = 100
     
-    # Get total count (before pagination)
-    count_query = select(func.count()).select_from(query.subquery())
-    count_result = await db.execute(count_query)
-    total_count = count_result.scalar() or 0
-    
     # Calculate skip
     skip = (page - 1) * page_size
     
-    # Apply pagination
-    paginated_query = query.offset(skip).limit(page_size)
+    # Fetch the page and the total in one round trip: the window count is
+    # evaluated over the filtered rows before LIMIT/OFFSET is applied
+    paginated_query = (
+        query.add_columns(func.count().over().label('_total'))
+        .offset(skip)
+        .limit(page_size)
+    )
     result = await db.execute(paginated_query)
-    items = list(result.scalars().all())
+    rows = result.all()
+    items = [row[0] for row in rows]
+    
+    if rows:
+        total_count = rows[0]._total
+    elif skip > 0:
+        # Past the last page there is no row to carry the total
+        count_query = select(func.count()).select_from(query.subquery())
+        count_result = await db.execute(count_query)
+        total_count = count_result.scalar() or 0
+    else:
+        total_count = 0
     
     return PaginationResult(
         items=items,
@@ -142,10 +168,13 @@ async def paginate_query_with_filters(
     """
     Paginate an async SQLAlchemy query with optional ordering
     
+    When order_by is given, results include a next_cursor; passing it back as
+    pagination.cursor switches to keyset pagination (no OFFSET scan).
+    
     Args:
         query: SQLAlchemy select statement
         db: AsyncSession
-        pagination: PaginationParams instance
+        pagination: PaginationParams instance (optionally carrying a cursor)
         order_by: Optional column to order by (e.g., Model.created_at.desc())
     
     Returns:
@@ -159,11 +188,127 @@ async def paginate_query_with_filters(
         return result.to_dict()
         ```
     """
-    # Apply ordering if provided
+    cursor = getattr(pagination, 'cursor', None)
+    if cursor and order_by is not None:
+        order_col, descending = _split_order_by(order_by)
+        return await paginate_query_keyset(
+            query,
+            db,
+            order_col,
+            cursor,
+            page_size=pagination.page_size,
+            descending=descending,
+            page=pagination.page
+        )
+    
+    # Apply ordering if provided (id breaks ties so cursors continue exactly)
     if order_by is not None:
-        query = query.order_by(order_by)
+        _, descending = _split_order_by(order_by)
+        id_col = query.column_descriptions[0]['entity'].id
+        query = query.order_by(order_by, id_col.desc() if descending else id_col.asc())
+    
+    result = await paginate_query(query, db, pagination.page, pagination.page_size)
+    
+    # Hand out a cursor so clients can switch to keyset pagination for deeper pages
+    if order_by is not None and result.has_next and result.items:
+        order_col, _ = _split_order_by(order_by)
+        last_item = result.items[-1]
+        result.next_cursor = _encode_cursor(getattr(last_item, order_col.key), last_item.id, result.total_count)
+    
+    return result
+
+
+async def paginate_query_keyset(
+    query: select,
+    db: AsyncSession,
+    order_col: Any,
+    cursor: str,
+    page_size: int = 20,
+    descending: bool = True,
+    page: int = 1
+) -> KeysetPaginationResult:
+    """
+    Paginate an async SQLAlchemy query by seeking past a cursor
+    
+    Instead of OFFSET, rows are filtered on (order_col, id) relative to the
+    last row of the previous page, so each page touches O(page_size) rows
+    regardless of depth. The total is counted once, on the first (offset)
+    page, and carried forward in the cursor rather than re-counted here.
+    
+    Args:
+        query: SQLAlchemy select statement over a single model
+        db: AsyncSession
+        order_col: Column the results are ordered by (e.g., Post.posted_at)
+        cursor: Cursor from the previous page's next_cursor
+        page_size: Number of items per page
+        descending: Whether results are ordered newest/largest first
+        page: Page number echoed back in the response
+    
+    Returns:
+        KeysetPaginationResult with items, next_cursor and metadata
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if page_size < 1:
+        page_size = 20
+    if page_size > 100:
+        page_size = 100
     
-    return await paginate_query(query, db, pagination.page, pagination.page_size)
+    id_col = query.column_descriptions[0]['entity'].id
+    last_value, last_id, total_count = _decode_cursor(cursor, order_col)
+    
+    if descending:
+        seek = or_(order_col < last_value, and_(order_col == last_value, id_col < last_id))
+        ordering = (order_col.desc(), id_col.desc())
+    else:
+        seek = or_(order_col > last_value, and_(order_col == last_value, id_col > last_id))
+        ordering = (order_col.asc(), id_col.asc())
+    
+    # Fetch one extra row to know whether another page follows
+    result = await db.execute(query.where(seek).order_by(*ordering).limit(page_size + 1))
+    items = list(result.scalars().all())
+    
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last_item = items[-1]
+        next_cursor = _encode_cursor(getattr(last_item, order_col.key), last_item.id, total_count)
+    
+    return KeysetPaginationResult(
+        items=items,
+        total_count=total_count,
+        page=page,
+        page_size=page_size,
+        next_cursor=next_cursor
+    )
+
+
+def _split_order_by(order_by: Any) -> Tuple[Any, bool]:
+    """Split an order_by clause (e.g., Post.posted_at.desc()) into column and direction"""
+    modifier = getattr(order_by, 'modifier', None)
+    if modifier in (operators.desc_op, operators.asc_op):
+        return order_by.element, modifier is operators.desc_op
+    return order_by, False
+
+
+def _encode_cursor(value: Any, row_id: int, total_count: int) -> str:
+    """Encode the last row's ordering value and id, plus the total, as an opaque cursor"""
+    return base64.urlsafe_b64encode(orjson.dumps([value, row_id, total_count])).decode('ascii')
+
+
+def _decode_cursor(cursor: str, order_col: Any) -> Tuple[Any, int, int]:
+    """Decode a cursor produced by _encode_cursor"""
+    try:
+        value, row_id, total_count = orjson.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if value is not None and isinstance(order_col.type, DateTime):
+            value = datetime.fromisoformat(value)
+        total_count = int(total_count)
+        if total_count < 0:
+            raise ValueError("negative total")
+        return value, int(row_id), total_count
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
 
 
 def create_pagination_metadata(
@@ -212,3 +357,39 @@ def get_pagination_dependency(
     """
     return PaginationParams(page=page, page_size=page_size)
 
+
+def pagination_headers(request: Request, data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Build response headers mirroring pagination metadata
+    
+    Lets clients read totals and navigate with a HEAD request instead of
+    fetching and decoding the items. The next link carries `cursor` only
+    when the result has a next_cursor, which only the posts endpoint
+    produces (it passes order_by and accepts a cursor); followers use
+    get_pagination_dependency, which has no cursor, so their links are
+    always page-numbered.
+    
+    Args:
+        request: Incoming request (its URL is the base for Link targets)
+        data: Paginated response dictionary (see PaginationResult.to_dict)
+    
+    Returns:
+        Dictionary with X-Total-Count, X-Total-Pages, X-Page, X-Page-Size and Link
+    """
+    headers = {
+        'X-Total-Count': str(data['total']),
+        'X-Total-Pages': str(data['total_pages']),
+        'X-Page': str(data['page']),
+        'X-Page-Size': str(data['page_size']),
+    }
+    
+    links = []
+    if data.get('next_cursor'):
+        links.append((request.url.include_query_params(cursor=data['next_cursor']), 'next'))
+    elif data['has_next']:
+        links.append((request.url.include_query_params(page=data['page'] + 1), 'next'))
+    if data['has_previous'] and not request.query_params.get('cursor'):
+        links.append((request.url.include_query_params(page=data['page'] - 1), 'prev'))
+    if links:
+        headers['Link'] = ', '.join(f'<{url}>; rel="{rel}"' for url, rel in links)
+    return headers
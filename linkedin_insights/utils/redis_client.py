@@ -3,100 +3,314 @@ Redis client utility
 Async Redis connection and operations
 """
 import logging
-import json
-from typing import Optional, Any
+from typing import Optional, Any, Tuple
+
+import orjson
 import redis.asyncio as aioredis
+import zstandard as zstd
 from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from fastapi import FastAPI, Request
 
-from linkedin_insights.utils.config import settings
+from linkedin_insights.utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-# Global Redis client instance
+# Shared Redis client, created once by init_redis at startup
 _redis_client: Optional[Redis] = None
 
+# Values larger than this are zstd-compressed. Stored values carry a one-byte
+# prefix: FLAG_RAW or FLAG_ZSTD; anything else is rejected on read.
+COMPRESSION_THRESHOLD = 4096
+FLAG_RAW = b"\x00"
+FLAG_ZSTD = b"\x01"
+_compressor = zstd.ZstdCompressor(level=1)
+_decompressor = zstd.ZstdDecompressor()
 
-async def get_redis_client() -> Optional[Redis]:
+# SCAN COUNT hint and keys per UNLINK call in delete_cache_pattern
+SCAN_COUNT = 500
+UNLINK_BATCH_SIZE = 512
+
+# Return the cached value, or atomically reserve the compute lock on a miss.
+# KEYS[1]=cache key, KEYS[2]=lock key, ARGV[1]=lock token, ARGV[2]=lock TTL (ms)
+GET_OR_RESERVE_SCRIPT = """
+local value = redis.call("GET", KEYS[1])
+if value then
+    return {1, value}
+end
+if redis.call("SET", KEYS[2], ARGV[1], "NX", "PX", ARGV[2]) then
+    return {0, 1}
+end
+return {0, 0}
+"""
+
+# Release a lock only if it is still held by the given token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Registered scripts run via EVALSHA (redis-py loads them on first NOSCRIPT)
+_get_or_reserve_script: Optional[AsyncScript] = None
+_release_lock_script: Optional[AsyncScript] = None
+
+
+def _build_redis_url() -> Optional[str]:
+    """Build the Redis URL from settings, or None if Redis is not configured"""
+    settings = get_settings()
+    if settings.REDIS_URL:
+        return settings.REDIS_URL
+    if not settings.REDIS_HOST:
+        return None
+    if settings.REDIS_PASSWORD:
+        return f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+    return f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+
+
+async def init_redis(app: Optional[FastAPI] = None) -> Optional[Redis]:
     """
-    Get or create Redis client instance
+    Create the shared Redis client (call once at startup)
+    
+    The client owns a bounded connection pool shared by all requests and is
+    stored both at module level and on `app.state.redis`.
+    
+    Args:
+        app: FastAPI application to attach the client to
     
     Returns:
-        Redis client or None if Redis is not configured
+        Redis client or None if Redis is not configured or unreachable
     """
     global _redis_client
     
-    if _redis_client is not None:
-        return _redis_client
-    
-    # Check if Redis is configured
-    if not settings.REDIS_URL and not settings.REDIS_HOST:
+    redis_url = _build_redis_url()
+    if redis_url is None:
         logger.warning("Redis not configured. Caching will be disabled.")
-        return None
-    
-    try:
-        # Use REDIS_URL if provided, otherwise construct from components
-        if settings.REDIS_URL:
-            redis_url = settings.REDIS_URL
-        else:
-            redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-            if settings.REDIS_PASSWORD:
-                redis_url = f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-        
-        _redis_client = aioredis.from_url(
-            redis_url,
-            encoding="utf-8",
-            decode_responses=True,
-            socket_connect_timeout=5,
-            socket_timeout=5,
-            retry_on_timeout=True,
-        )
-        
-        # Test connection
-        await _redis_client.ping()
-        logger.info("Redis client connected successfully")
+    else:
+        try:
+            # Values stay as raw bytes and are decoded by orjson directly
+            client = aioredis.from_url(
+                redis_url,
+                max_connections=max(32, get_settings().REDIS_POOL_SIZE),
+                health_check_interval=30,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+            )
+            
+            # Test connection
+            await client.ping()
+            _redis_client = client
+            logger.info("Redis client connected successfully")
         
-        return _redis_client
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {str(e)}")
+            _redis_client = None
     
-    except Exception as e:
-        logger.error(f"Failed to connect to Redis: {str(e)}")
-        _redis_client = None
-        return None
+    if app is not None:
+        app.state.redis = _redis_client
+    return _redis_client
 
 
-async def close_redis_client():
-    """Close Redis client connection"""
-    global _redis_client
+async def close_redis(app: Optional[FastAPI] = None):
+    """Close the shared Redis client (call once at shutdown)"""
+    global _redis_client, _get_or_reserve_script, _release_lock_script
     if _redis_client:
         await _redis_client.close()
         _redis_client = None
+        _get_or_reserve_script = None
+        _release_lock_script = None
         logger.info("Redis client closed")
+    if app is not None:
+        app.state.redis = None
+
+
+async def get_redis_client() -> Optional[Redis]:
+    """
+    Get the shared Redis client
+    
+    Returns:
+        Redis client or None if Redis is not configured or not initialized
+    """
+    return _redis_client
+
+
+def get_redis(request: Request) -> Optional[Redis]:
+    """FastAPI dependency returning the Redis client created at startup"""
+    return getattr(request.app.state, "redis", None)
 
 
-async def get_cache(key: str) -> Optional[Any]:
+def _encode_value(value: Any, serialized: bool = False) -> bytes:
+    """Serialize a value with orjson, compressing large payloads with zstd"""
+    if serialized:
+        payload = value
+    else:
+        payload = orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    if len(payload) > COMPRESSION_THRESHOLD:
+        return FLAG_ZSTD + _compressor.compress(payload)
+    return FLAG_RAW + payload
+
+
+def _decode_value(raw: bytes, serialized: bool = False) -> Any:
+    """
+    Inverse of _encode_value (returns the stored bytes if serialized)
+    
+    Raises:
+        ValueError: If the value does not start with a known flag byte
+    """
+    flag = raw[:1]
+    if flag == FLAG_ZSTD:
+        payload = _decompressor.decompress(raw[1:])
+    elif flag == FLAG_RAW:
+        payload = raw[1:]
+    else:
+        raise ValueError(f"Unknown cache value flag: {flag!r}")
+    return payload if serialized else orjson.loads(payload)
+
+
+def _get_scripts(client: Redis) -> Tuple[AsyncScript, AsyncScript]:
+    """Register Lua scripts once per client"""
+    global _get_or_reserve_script, _release_lock_script
+    if _get_or_reserve_script is None or _release_lock_script is None:
+        _get_or_reserve_script = client.register_script(GET_OR_RESERVE_SCRIPT)
+        _release_lock_script = client.register_script(RELEASE_LOCK_SCRIPT)
+    return _get_or_reserve_script, _release_lock_script
+
+
+async def get_cache(key: str, client: Optional[Redis] = None, serialized: bool = False) -> Optional[Any]:
     """
     Get value from cache
     
     Args:
         key: Cache key
+        client: Redis client (defaults to the shared client)
+        serialized: Return the stored bytes without decoding them
     
     Returns:
         Cached value or None if not found
     """
-    client = await get_redis_client()
-    if not client:
+    client = _redis_client if client is None else client
+    if client is None:
         return None
     
     try:
-        value = await client.get(key)
-        if value:
-            return json.loads(value)
+        raw = await client.get(key)
+        if raw:
+            return _decode_value(raw, serialized)
         return None
     except Exception as e:
         logger.error(f"Error getting cache key {key}: {str(e)}")
         return None
 
 
-async def set_cache(key: str, value: Any, ttl: Optional[int] = None) -> bool:
+async def get_and_touch(
+    key: str,
+    ttl: Optional[int] = None,
+    client: Optional[Redis] = None,
+    serialized: bool = False
+) -> Optional[Any]:
+    """
+    Get value from cache and extend its TTL in a single round trip
+    
+    Args:
+        key: Cache key
+        ttl: New time to live in seconds (defaults to REDIS_CACHE_TTL)
+        client: Redis client (defaults to the shared client)
+        serialized: Return the stored bytes without decoding them
+    
+    Returns:
+        Cached value or None if not found
+    """
+    client = _redis_client if client is None else client
+    if client is None:
+        return None
+    
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.expire(key, ttl or get_settings().REDIS_CACHE_TTL)
+            raw, _ = await pipe.execute()
+        if raw:
+            return _decode_value(raw, serialized)
+        return None
+    except Exception as e:
+        logger.error(f"Error getting cache key {key}: {str(e)}")
+        return None
+
+
+async def get_or_reserve(
+    key: str,
+    lock_key: str,
+    lock_token: str,
+    lock_ttl_ms: int,
+    client: Optional[Redis] = None,
+    serialized: bool = False
+) -> Tuple[Optional[Any], bool]:
+    """
+    Get value from cache, or reserve the compute lock if it is missing
+    
+    Runs atomically as one Lua script, so a miss and the lock acquisition
+    cost a single round trip with no race between them.
+    
+    Args:
+        key: Cache key
+        lock_key: Lock key guarding computation of `key`
+        lock_token: Unique token identifying this lock holder
+        lock_ttl_ms: Lock expiry in milliseconds
+        client: Redis client (defaults to the shared client)
+        serialized: Return the stored bytes without decoding them
+    
+    Returns:
+        Tuple of (cached value or None, whether the lock was acquired).
+        Without Redis this returns (None, True) so the caller just computes.
+    """
+    client = _redis_client if client is None else client
+    if client is None:
+        return None, True
+    
+    try:
+        get_or_reserve_script, _ = _get_scripts(client)
+        found, payload = await get_or_reserve_script(keys=[key, lock_key], args=[lock_token, lock_ttl_ms])
+        if found:
+            return _decode_value(payload, serialized), False
+        return None, bool(payload)
+    except Exception as e:
+        logger.error(f"Error reserving cache key {key}: {str(e)}")
+        return None, True
+
+
+async def release_lock(lock_key: str, lock_token: str, client: Optional[Redis] = None) -> bool:
+    """
+    Release a lock taken by get_or_reserve if it is still ours
+    
+    Args:
+        lock_key: Lock key
+        lock_token: Token passed to get_or_reserve
+        client: Redis client (defaults to the shared client)
+    
+    Returns:
+        True if the lock was released, False otherwise
+    """
+    client = _redis_client if client is None else client
+    if client is None:
+        return False
+    
+    try:
+        _, release_lock_script = _get_scripts(client)
+        return bool(await release_lock_script(keys=[lock_key], args=[lock_token]))
+    except Exception as e:
+        logger.error(f"Error releasing lock {lock_key}: {str(e)}")
+        return False
+
+
+async def set_cache(
+    key: str,
+    value: Any,
+    ttl: Optional[int] = None,
+    client: Optional[Redis] = None,
+    serialized: bool = False
+) -> bool:
     """
     Set value in cache
     
@@ -104,36 +318,38 @@ async def set_cache(key: str, value: Any, ttl: Optional[int] = None) -> bool:
         key: Cache key
         value: Value to cache (must be JSON serializable)
         ttl: Time to live in seconds (defaults to REDIS_CACHE_TTL)
+        client: Redis client (defaults to the shared client)
+        serialized: `value` is already-encoded bytes to store as-is
     
     Returns:
         True if successful, False otherwise
     """
-    client = await get_redis_client()
-    if not client:
+    client = _redis_client if client is None else client
+    if client is None:
         return False
     
     try:
-        ttl = ttl or settings.REDIS_CACHE_TTL
-        serialized_value = json.dumps(value, default=str)
-        await client.setex(key, ttl, serialized_value)
+        ttl = ttl or get_settings().REDIS_CACHE_TTL
+        await client.setex(key, ttl, _encode_value(value, serialized))
         return True
     except Exception as e:
         logger.error(f"Error setting cache key {key}: {str(e)}")
         return False
 
 
-async def delete_cache(key: str) -> bool:
+async def delete_cache(key: str, client: Optional[Redis] = None) -> bool:
     """
     Delete key from cache
     
     Args:
         key: Cache key to delete
+        client: Redis client (defaults to the shared client)
     
     Returns:
         True if successful, False otherwise
     """
-    client = await get_redis_client()
-    if not client:
+    client = _redis_client if client is None else client
+    if client is None:
         return False
     
     try:
@@ -144,42 +360,52 @@ async def delete_cache(key: str) -> bool:
         return False
 
 
-async def delete_cache_pattern(pattern: str) -> int:
+async def delete_cache_pattern(pattern: str, client: Optional[Redis] = None) -> int:
     """
     Delete all keys matching pattern
     
     Args:
         pattern: Redis key pattern (e.g., "page:*")
+        client: Redis client (defaults to the shared client)
     
     Returns:
         Number of keys deleted
     """
-    client = await get_redis_client()
-    if not client:
+    client = _redis_client if client is None else client
+    if client is None:
         return 0
     
     try:
-        keys = []
-        async for key in client.scan_iter(match=pattern):
-            keys.append(key)
+        # Stream keys in batches and UNLINK them so memory stays constant here
+        # and Redis frees the values off its main thread
+        deleted = 0
+        batch = []
+        async for key in client.scan_iter(match=pattern, count=SCAN_COUNT):
+            batch.append(key)
+            if len(batch) >= UNLINK_BATCH_SIZE:
+                deleted += await client.unlink(*batch)
+                batch.clear()
         
-        if keys:
-            return await client.delete(*keys)
-        return 0
+        if batch:
+            deleted += await client.unlink(*batch)
+        return deleted
     except Exception as e:
         logger.error(f"Error deleting cache pattern {pattern}: {str(e)}")
         return 0
 
 
-async def clear_cache() -> bool:
+async def clear_cache(client: Optional[Redis] = None) -> bool:
     """
     Clear all cache
     
+    Args:
+        client: Redis client (defaults to the shared client)
+    
     Returns:
         True if successful, False otherwise
     """
-    client = await get_redis_client()
-    if not client:
+    client = _redis_client if client is None else client
+    if client is None:
         return False
     
     try:
@@ -2,56 +2,213 @@
 Pytest configuration and fixtures
 Shared test fixtures and configuration
 """
+import asyncio
+import functools
+import time
+
+import fakeredis.aioredis
+import httpx
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
+from typing import Dict, List
 
-from linkedin_insights.main import app
 from linkedin_insights.db.base import Base, get_db
+from linkedin_insights.utils import redis_client
+from linkedin_insights.utils.config import get_settings
 from linkedin_insights.models.insight import Insight, ScraperRun
-from linkedin_insights.models.linkedin import LinkedInPage, Post, Comment, SocialMediaUser
+from linkedin_insights.models.linkedin import Industry, LinkedInPage, Post, Comment, SocialMediaUser
+
+# Test database URL (in-memory SQLite, shared by every test through StaticPool)
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite://"
 
-# Test database URL (use SQLite for testing)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="session")
+def test_settings():
+    """
+    Settings for tests: SQLite database, no Redis
+    
+    Code reads settings through get_settings() rather than a FastAPI
+    dependency, so the environment is patched and the cached instance cleared.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+        mp.setenv("REDIS_URL", "")
+        mp.setenv("REDIS_HOST", "")
+        get_settings.cache_clear()
+        yield get_settings()
+    get_settings.cache_clear()
 
 
-@pytest.fixture
-def db_session():
-    """Create test database session"""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.rollback()
-        db.close()
-    Base.metadata.drop_all(bind=engine)
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole test session, shared by the session-scoped async fixtures"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def engine():
+    """Create the async test engine and schema once for the whole test session"""
+    test_engine = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=StaticPool)
+    
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work on SQLite
+    @event.listens_for(test_engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(test_engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield test_engine
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await test_engine.dispose()
+
+
+# Session of the running test, read by the get_db override
+_current_session: Dict[str, AsyncSession] = {}
+
+
+class _NoopScraperPool:
+    """Scraper pool stand-in so app startup doesn't launch Chromium"""
+    
+    async def start(self) -> None:
+        pass
+    
+    async def stop(self) -> None:
+        pass
+
+
+@pytest.fixture(scope="session")
+async def app(test_settings):
+    """
+    FastAPI app with test overrides, started once for the whole test session
+    
+    get_db serves the current test's session; the lock keeps concurrent
+    requests from using that one AsyncSession at the same time. The lifespan
+    gets a no-op scraper pool; scraper tests bring their own fakes.
+    """
+    # Imported here, not at module level: the app pulls in Playwright, and
+    # tests that don't need the app must still collect (and skip) without it
+    from linkedin_insights.main import app as fastapi_app
+    
+    session_lock = asyncio.Lock()
+    
+    async def override_get_db():
+        async with session_lock:
+            yield _current_session["db"]
+    
+    fastapi_app.dependency_overrides[get_db] = override_get_db
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("linkedin_insights.main.get_scraper_pool", _NoopScraperPool)
+        async with fastapi_app.router.lifespan_context(fastapi_app):
+            yield fastapi_app
+    fastapi_app.dependency_overrides.clear()
 
 
 @pytest.fixture
-def client(db_session):
-    """Create test client with database override"""
-    def override_get_db():
+async def db_session(engine):
+    """
+    Create test database session
+    
+    The session is joined to an outer transaction that is rolled back after
+    the test; commits in the test only release SAVEPOINTs.
+    """
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        db = AsyncSession(
+            bind=connection,
+            autoflush=False,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        _current_session["db"] = db
         try:
-            yield db_session
+            yield db
         finally:
-            pass  # Don't close, handled by fixture
+            _current_session.pop("db", None)
+            await db.close()
+            await transaction.rollback()
+
+
+@pytest.fixture
+async def fake_redis(monkeypatch):
+    """
+    In-memory Redis installed as the shared client
     
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
+    fakeredis runs the Lua scripts too, so reserve/release and the limiter
+    execute their real server-side logic.
+    """
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(redis_client, "_redis_client", client)
+    monkeypatch.setattr(redis_client, "_get_or_reserve_script", None)
+    monkeypatch.setattr(redis_client, "_release_lock_script", None)
+    yield client
+    await client.flushall()
+    await client.close()
+
+
+@pytest.fixture
+async def scrape_slots_full(fake_redis):
+    """Take every global scrape slot, so the next scrape is rejected with 429"""
+    from linkedin_insights.services.scraper_service import ACTIVE_SCRAPES_KEY
+    from linkedin_insights.utils.config import settings
+    
+    now_ms = int(time.time() * 1000)
+    await fake_redis.zadd(
+        ACTIVE_SCRAPES_KEY,
+        {f"busy-{i}": now_ms for i in range(settings.SCRAPER_GLOBAL_MAX_CONCURRENCY)}
+    )
+
+
+@pytest.fixture
+def sql_statements(engine):
+    """Record every SQL statement sent to the test database during a test"""
+    statements: List[str] = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def client(app, db_session):
+    """httpx AsyncClient calling the app in-process, with get_db bound to this test's session"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
         yield test_client
-    app.dependency_overrides.clear()
+
+
+async def _get_or_create_industry(session: AsyncSession, name: str) -> Industry:
+    """Look up an industry by name, adding it if missing"""
+    industry = (
+        await session.scalars(select(Industry).where(Industry.name == name))
+    ).one_or_none()
+    if industry is None:
+        industry = Industry(name=name)
+        session.add(industry)
+        await session.flush()
+    return industry
+
+
+@pytest.fixture
+def get_industry(db_session):
+    """Return a coroutine function mapping an industry name to its Industry row"""
+    return functools.partial(_get_or_create_industry, db_session)
 
 
 @pytest.fixture
-def sample_page(db_session):
+async def sample_page(db_session, get_industry):
     """Create a sample LinkedIn page for testing"""
     page = LinkedInPage(
         page_id="test-company",
@@ -59,58 +216,79 @@ def sample_page(db_session):
         url="https://www.linkedin.com/company/test-company",
         linkedin_internal_id="123456",
         description="A test company",
-        industry="Technology",
+        industry_ref=await get_industry("Technology"),
         total_followers=1000,
         head_count=50,
         specialities="Software, AI",
         profile_image_url="https://example.com/image.jpg"
     )
     db_session.add(page)
-    db_session.commit()
-    db_session.refresh(page)
+    await db_session.commit()
+    await db_session.refresh(page)
     return page
 
 
-@pytest.fixture
-def sample_pages(db_session):
-    """Create multiple sample pages for testing"""
-    pages = [
-        LinkedInPage(
-            page_id=f"company-{i}",
-            name=f"Company {i}",
-            url=f"https://www.linkedin.com/company/company-{i}",
-            industry="Technology" if i % 2 == 0 else "Finance",
-            total_followers=1000 * i,
-            head_count=10 * i
-        )
-        for i in range(1, 11)
-    ]
-    for page in pages:
-        db_session.add(page)
-    db_session.commit()
-    for page in pages:
-        db_session.refresh(page)
-    return pages
+@pytest.fixture(scope="session")
+async def sample_pages(engine):
+    """
+    Create multiple sample pages, once for the whole test session
+    
+    The rows are committed outside the per-test transactions, so every test
+    sees them afterwards; tests must treat them as read-only. They are
+    deleted again when the session ends.
+    """
+    industry_names = ("Technology", "Finance")
+    # One multi-row INSERT ... RETURNING instead of a flush per object
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        existing_industries = set((await session.scalars(
+            select(Industry.name).where(Industry.name.in_(industry_names))
+        )).all())
+        industry_ids = {
+            name: (await _get_or_create_industry(session, name)).id
+            for name in industry_names
+        }
+        pages = (await session.scalars(
+            insert(LinkedInPage).returning(LinkedInPage, sort_by_parameter_order=True),
+            [
+                {
+                    "page_id": f"company-{i}",
+                    "name": f"Company {i}",
+                    "url": f"https://www.linkedin.com/company/company-{i}",
+                    "industry_id": industry_ids["Technology" if i % 2 == 0 else "Finance"],
+                    "total_followers": 1000 * i,
+                    "head_count": 10 * i,
+                }
+                for i in range(1, 11)
+            ]
+        )).all()
+        await session.commit()
+    
+    yield pages
+    
+    async with AsyncSession(engine) as session:
+        await session.execute(delete(LinkedInPage).where(LinkedInPage.id.in_([page.id for page in pages])))
+        await session.execute(delete(Industry).where(
+            Industry.name.in_([name for name in industry_names if name not in existing_industries])
+        ))
+        await session.commit()
 
 
 @pytest.fixture
-def sample_posts(db_session, sample_page):
+async def sample_posts(db_session, sample_page):
     """Create sample posts for testing"""
-    posts = [
-        Post(
-            post_id=f"post-{i}",
-            page_id=sample_page.id,
-            content=f"Post content {i}",
-            like_count=10 * i,
-            comment_count=5 * i,
-            posted_at=datetime.utcnow()
-        )
-        for i in range(1, 6)
-    ]
-    for post in posts:
-        db_session.add(post)
-    db_session.commit()
-    for post in posts:
-        db_session.refresh(post)
+    posts = (await db_session.scalars(
+        insert(Post).returning(Post, sort_by_parameter_order=True),
+        [
+            {
+                "post_id": f"post-{i}",
+                "page_id": sample_page.id,
+                "content": f"Post content {i}",
+                "like_count": 10 * i,
+                "comment_count": 5 * i,
+                "posted_at": datetime.utcnow(),
+            }
+            for i in range(1, 6)
+        ]
+    )).all()
+    await db_session.commit()
     return posts
-
@@ -0,0 +1,6 @@
+"""
+Shared test constants
+"""
+
+# Fixed timestamp for mocked scrape results
+FAKE_SCRAPED_AT = "2024-01-01T00:00:00"
@@ -4,10 +4,12 @@ Tests for insights endpoints
 import pytest
 from fastapi import status
 
+pytestmark = pytest.mark.db
 
-def test_create_insight(client):
+
+async def test_create_insight(client):
     """Test creating an insight"""
-    response = client.post(
+    response = await client.post(
         "/api/v1/insights/",
         json={
             "profile_url": "https://linkedin.com/in/test",
@@ -18,9 +20,9 @@ def test_create_insight(client):
     assert response.json()["profile_name"] == "Test User"
 
 
-def test_get_insights(client):
+async def test_get_insights(client):
     """Test getting all insights"""
-    response = client.get("/api/v1/insights/")
+    response = await client.get("/api/v1/insights/")
     assert response.status_code == status.HTTP_200_OK
     assert "items" in response.json()
 
@@ -1,34 +1,49 @@
 """
 Tests for LinkedIn pages endpoints
 """
+import asyncio
+import base64
+from datetime import datetime
+
+import orjson
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi import status
-from datetime import datetime
+from sqlalchemy import event, insert, select, text
 
 from linkedin_insights.models.linkedin import LinkedInPage, Post, SocialMediaUser
 
+from tests.constants import FAKE_SCRAPED_AT
+
+pytestmark = pytest.mark.db
+
+
+def json_body(response):
+    """Decode a response body with orjson"""
+    return orjson.loads(response.content)
+
 
 class TestGetPage:
     """Tests for GET /pages/{page_id} endpoint"""
     
-    def test_get_page_from_db(self, client, sample_page):
+    async def test_get_page_from_db(self, client, sample_page):
         """Test getting a page that exists in database"""
-        response = client.get(f"/api/v1/pages/{sample_page.page_id}")
+        response = await client.get(f"/api/v1/pages/{sample_page.page_id}")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        data = json_body(response)
         assert data["page_id"] == sample_page.page_id
         assert data["name"] == sample_page.name
         assert data["id"] == sample_page.id
+        # Fields not scraped (None) are omitted
+        assert "website" not in data
     
-    @patch('linkedin_insights.api.v1.endpoints.pages.LinkedInPageScraper')
+    @patch('linkedin_insights.api.v1.endpoints.pages.ScraperService')
     @patch('linkedin_insights.api.v1.endpoints.pages.LinkedInPageService')
-    def test_get_page_scrapes_if_not_in_db(self, mock_service_class, mock_scraper_class, client, db_session):
+    async def test_get_page_scrapes_if_not_in_db(self, mock_service_class, mock_scraper_class, client, db_session, get_industry):
         """Test that page is scraped if not found in database"""
-        import asyncio
         
-        # Mock scraper with async function
+        # Mock scraper service with async function
         async def mock_scrape(page_id):
             return {
                 'page_info': {
@@ -46,11 +61,11 @@ class TestGetPage:
                 },
                 'posts': [],
                 'employees': [],
-                'scraped_at': datetime.utcnow().isoformat()
+                'scraped_at': FAKE_SCRAPED_AT
             }
         
         mock_scraper = MagicMock()
-        mock_scraper.scrape_page = mock_scrape
+        mock_scraper.scrape_linkedin_page = mock_scrape
         mock_scraper_class.return_value = mock_scraper
         
         # Mock service
@@ -71,103 +86,152 @@ class TestGetPage:
             url='https://www.linkedin.com/company/new-company',
             linkedin_internal_id='789',
             description='A new company',
-            industry='Technology',
+            industry_ref=await get_industry('Technology'),
             total_followers=5000,
             head_count=100
         )
         db_session.add(page)
-        db_session.commit()
-        db_session.refresh(page)
+        await db_session.commit()
+        await db_session.refresh(page)
         
-        # Make request - TestClient handles async endpoints
-        response = client.get("/api/v1/pages/new-company")
+        # Make request through the in-process ASGI client
+        response = await client.get("/api/v1/pages/new-company")
         
         # Should return 200 if page exists, or handle scraping
         assert response.status_code in [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND, status.HTTP_500_INTERNAL_SERVER_ERROR]
     
-    def test_get_page_not_found(self, client):
+    async def test_get_page_not_found(self, client):
         """Test getting a page that doesn't exist"""
-        response = client.get("/api/v1/pages/non-existent-company")
+        response = await client.get("/api/v1/pages/non-existent-company")
         
         # Should return 404 or 500 depending on scraper behavior
         assert response.status_code in [status.HTTP_404_NOT_FOUND, status.HTTP_500_INTERNAL_SERVER_ERROR]
+    
+    async def test_get_page_scrape_limit_returns_429(self, client, scrape_slots_full):
+        """Test a page that needs scraping gets 429 while every global scrape slot is taken"""
+        response = await client.get("/api/v1/pages/unscraped-company")
+        
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Too many concurrent requests" in json_body(response)["detail"]
 
 
 class TestGetPages:
     """Tests for GET /pages endpoint with filters"""
     
-    def test_get_pages_no_filters(self, client, sample_pages):
-        """Test getting all pages without filters"""
-        response = client.get("/api/v1/pages")
+    async def test_get_pages_filters(self, client, sample_pages):
+        """Test the single filters, issued concurrently"""
+        checks = {
+            "/api/v1/pages": lambda item: True,
+            "/api/v1/pages?follower_count_min=5000": lambda item: item["total_followers"] >= 5000,
+            "/api/v1/pages?follower_count_max=3000": lambda item: item["total_followers"] <= 3000,
+            "/api/v1/pages?industry=Technology": lambda item: "Technology" in item.get("industry", ""),
+        }
+        urls = list(checks) + ["/api/v1/pages?page_name=Company 1"]
+        responses = await asyncio.gather(*(client.get(url) for url in urls))
+        results = dict(zip(urls, responses))
         
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        for url, response in results.items():
+            assert response.status_code == status.HTTP_200_OK, url
+        
+        # No filters
+        data = json_body(results["/api/v1/pages"])
         assert "items" in data
         assert "total" in data
         assert "page" in data
         assert "page_size" in data
-        assert len(data["items"]) <= 20  # Default page size
-        assert data["total"] >= 10
-    
-    def test_get_pages_with_follower_count_min(self, client, sample_pages):
-        """Test filtering by minimum follower count"""
-        response = client.get("/api/v1/pages?follower_count_min=5000")
-        
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert all(item["total_followers"] >= 5000 for item in data["items"])
-    
-    def test_get_pages_with_follower_count_max(self, client, sample_pages):
-        """Test filtering by maximum follower count"""
-        response = client.get("/api/v1/pages?follower_count_max=3000")
-        
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert all(item["total_followers"] <= 3000 for item in data["items"])
-    
-    def test_get_pages_with_industry_filter(self, client, sample_pages):
-        """Test filtering by industry"""
-        response = client.get("/api/v1/pages?industry=Technology")
+        assert len(data["items"]) == 10  # Within the default page size of 20
+        assert data["total"] == 10
         
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert all("Technology" in item.get("industry", "") for item in data["items"])
-    
-    def test_get_pages_with_page_name_filter(self, client, sample_pages):
-        """Test filtering by page name (partial match)"""
-        response = client.get("/api/v1/pages?page_name=Company 1")
+        # follower_count_min / follower_count_max / industry
+        for url, check in checks.items():
+            assert all(check(item) for item in json_body(results[url])["items"]), url
         
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        # Page name (partial match)
+        data = json_body(results["/api/v1/pages?page_name=Company 1"])
         assert any("Company 1" in item["name"] for item in data["items"])
     
-    def test_get_pages_with_multiple_filters(self, client, sample_pages):
+    async def test_get_pages_with_multiple_filters(self, client, sample_pages, sql_statements):
         """Test filtering with multiple parameters"""
-        response = client.get(
+        sql_statements.clear()
+        response = await client.get(
             "/api/v1/pages?follower_count_min=2000&follower_count_max=8000&industry=Technology"
         )
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        data = json_body(response)
         for item in data["items"]:
             assert item["total_followers"] >= 2000
             assert item["total_followers"] <= 8000
             assert "Technology" in item.get("industry", "")
+        
+        # All three filters must be SQL predicates applied before LIMIT,
+        # not filtered in Python after fetching the table
+        page_selects = [s for s in sql_statements if "FROM linkedin_pages" in s]
+        assert page_selects
+        for statement in page_selects:
+            where_clause = statement[statement.index("WHERE"):statement.index("LIMIT")]
+            assert "total_followers >=" in where_clause
+            assert "total_followers <=" in where_clause
+            assert "industry" in where_clause
+    
+    async def test_industry_follower_filter_uses_compound_index(self, client, db_session, engine, sample_pages):
+        """Test the endpoint's industry + follower range query seeks idx_industry_followers instead of scanning"""
+        emitted = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            emitted.append((statement, parameters))
+        
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(
+                "/api/v1/pages?industry=Technology&follower_count_min=2000&follower_count_max=8000"
+            )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        
+        assert response.status_code == status.HTTP_200_OK
+        # The page query itself, not its COUNT
+        statement, parameters = next(
+            (statement, parameters) for statement, parameters in emitted
+            if statement.startswith("SELECT linkedin_pages.")
+        )
+        connection = await db_session.connection()
+        plan = (await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+        details = [row[-1] for row in plan]
+        
+        assert any("USING INDEX idx_industry_followers" in detail for detail in details)
+        assert not any(detail.startswith("SCAN linkedin_pages") for detail in details)
     
-    def test_get_pages_pagination(self, client, sample_pages):
+    async def test_industry_stored_as_integer_id(self, db_session, sample_pages, sql_statements, client):
+        """Test pages store a SMALLINT industry id and the filter compares ids"""
+        industry_ids = (await db_session.scalars(
+            text("SELECT industry_id FROM linkedin_pages WHERE page_id LIKE 'company-%'")
+        )).all()
+        assert industry_ids
+        assert all(isinstance(industry_id, int) for industry_id in industry_ids)
+        
+        sql_statements.clear()
+        response = await client.get("/api/v1/pages?industry=Technology")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert all(item["industry"] == "Technology" for item in json_body(response)["items"])
+        page_selects = [s for s in sql_statements if "FROM linkedin_pages" in s]
+        assert any("linkedin_pages.industry_id IN (SELECT industries.id" in s for s in page_selects)
+    
+    async def test_get_pages_pagination(self, client, sample_pages):
         """Test pagination"""
         # First page
-        response1 = client.get("/api/v1/pages?page=1&page_size=5")
+        response1 = await client.get("/api/v1/pages?page=1&page_size=5")
         assert response1.status_code == status.HTTP_200_OK
-        data1 = response1.json()
+        data1 = json_body(response1)
         assert len(data1["items"]) == 5
         assert data1["page"] == 1
         assert data1["page_size"] == 5
         
         # Second page
-        response2 = client.get("/api/v1/pages?page=2&page_size=5")
+        response2 = await client.get("/api/v1/pages?page=2&page_size=5")
         assert response2.status_code == status.HTTP_200_OK
-        data2 = response2.json()
+        data2 = json_body(response2)
         assert len(data2["items"]) == 5
         assert data2["page"] == 2
         
@@ -178,33 +242,80 @@ class TestGetPages:
 class TestGetPagePosts:
     """Tests for GET /pages/{page_id}/posts endpoint"""
     
-    def test_get_page_posts(self, client, sample_page, sample_posts):
+    async def test_get_page_posts(self, client, sample_page, sample_posts):
         """Test getting posts for a page"""
-        response = client.get(f"/api/v1/pages/{sample_page.page_id}/posts")
+        response = await client.get(f"/api/v1/pages/{sample_page.page_id}/posts")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        data = json_body(response)
         assert "items" in data
         assert "total" in data
         assert len(data["items"]) == 5
         assert data["total"] == 5
     
-    def test_get_page_posts_pagination(self, client, sample_page, sample_posts):
-        """Test pagination for posts"""
-        response = client.get(f"/api/v1/pages/{sample_page.page_id}/posts?page=1&page_size=2")
+    async def test_get_page_posts_pagination(self, client, sample_page, sample_posts):
+        """Test pagination metadata for posts via a HEAD probe"""
+        response = await client.head(f"/api/v1/pages/{sample_page.page_id}/posts?page=1&page_size=2")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert len(data["items"]) == 2
-        assert data["page"] == 1
-        assert data["page_size"] == 2
-        assert data["total"] == 5
-        assert data["has_next"] is True
-        assert data["has_previous"] is False
+        assert response.content == b""
+        assert response.headers["X-Page"] == "1"
+        assert response.headers["X-Page-Size"] == "2"
+        assert response.headers["X-Total-Count"] == "5"
+        assert response.headers["X-Total-Pages"] == "3"
+        assert 'rel="next"' in response.headers["Link"]
+        assert 'rel="prev"' not in response.headers["Link"]
     
-    def test_get_page_posts_page_not_found(self, client):
+    async def test_get_page_posts_cursor_walk(self, client, db_session, sample_page, sql_statements):
+        """Test following next_cursor visits every post once, in order, including posted_at ties"""
+        posted_at = [datetime(2024, 1, day) for day in (5, 4, 4, 4, 3, 2, 2)]
+        await db_session.execute(
+            insert(Post),
+            [
+                {"post_id": f"post-{i}", "page_id": sample_page.id, "posted_at": value}
+                for i, value in enumerate(posted_at)
+            ]
+        )
+        await db_session.commit()
+        expected = (await db_session.scalars(
+            select(Post.post_id)
+            .where(Post.page_id == sample_page.id)
+            .order_by(Post.posted_at.desc(), Post.id.desc())
+        )).all()
+        
+        url = f"/api/v1/pages/{sample_page.page_id}/posts"
+        response = await client.get(url, params={"page_size": 2})
+        seen = [item["post_id"] for item in json_body(response)["items"]]
+        next_cursor = json_body(response)["next_cursor"]
+        sql_statements.clear()
+        while next_cursor:
+            response = await client.get(url, params={"page_size": 2, "cursor": next_cursor})
+            assert response.status_code == status.HTTP_200_OK
+            data = json_body(response)
+            assert data["total"] == len(posted_at)
+            seen.extend(item["post_id"] for item in data["items"])
+            next_cursor = data["next_cursor"]
+        
+        assert seen == expected
+        # Keyset pages reuse the first page's total instead of counting again
+        assert not any("count(" in statement.lower() for statement in sql_statements)
+    
+    @pytest.mark.parametrize(
+        "cursor",
+        ["not-a-cursor", "%%%", base64.urlsafe_b64encode(b'["2024-01-01T00:00:00", 1]').decode()],
+        ids=["garbage", "not-base64", "missing-total"],
+    )
+    async def test_get_page_posts_bad_cursor(self, client, sample_page, cursor):
+        """Test a malformed cursor is rejected with 400"""
+        response = await client.get(
+            f"/api/v1/pages/{sample_page.page_id}/posts", params={"cursor": cursor}
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    async def test_get_page_posts_page_not_found(self, client):
         """Test getting posts for non-existent page"""
-        response = client.get("/api/v1/pages/non-existent/posts")
+        response = await client.get("/api/v1/pages/non-existent/posts")
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
@@ -212,59 +323,63 @@ class TestGetPagePosts:
 class TestGetPageFollowers:
     """Tests for GET /pages/{page_id}/followers endpoint"""
     
-    def test_get_page_followers(self, client, sample_page, db_session):
+    async def test_get_page_followers(self, client, sample_page, db_session):
         """Test getting followers for a page"""
         # Create sample followers
-        followers = [
-            SocialMediaUser(
-                linkedin_user_id=f"user-{i}",
-                name=f"User {i}",
-                title=f"Title {i}",
-                profile_url=f"https://linkedin.com/in/user-{i}",
-                page_id=sample_page.id
-            )
-            for i in range(1, 6)
-        ]
-        for follower in followers:
-            db_session.add(follower)
-        db_session.commit()
+        await db_session.execute(
+            insert(SocialMediaUser),
+            [
+                {
+                    "linkedin_user_id": f"user-{i}",
+                    "name": f"User {i}",
+                    "title": f"Title {i}",
+                    "profile_url": f"https://linkedin.com/in/user-{i}",
+                    "page_id": sample_page.id,
+                }
+                for i in range(1, 6)
+            ]
+        )
+        await db_session.commit()
         
-        response = client.get(f"/api/v1/pages/{sample_page.page_id}/followers")
+        response = await client.get(f"/api/v1/pages/{sample_page.page_id}/followers")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        data = json_body(response)
         assert "items" in data
         assert len(data["items"]) == 5
         assert data["total"] == 5
     
-    def test_get_page_followers_pagination(self, client, sample_page, db_session):
+    async def test_get_page_followers_pagination(self, client, sample_page, db_session):
         """Test pagination for followers"""
         # Create sample followers
-        followers = [
-            SocialMediaUser(
-                linkedin_user_id=f"user-{i}",
-                name=f"User {i}",
-                title=f"Title {i}",
-                profile_url=f"https://linkedin.com/in/user-{i}",
-                page_id=sample_page.id
-            )
-            for i in range(1, 11)
-        ]
-        for follower in followers:
-            db_session.add(follower)
-        db_session.commit()
+        await db_session.execute(
+            insert(SocialMediaUser),
+            [
+                {
+                    "linkedin_user_id": f"user-{i}",
+                    "name": f"User {i}",
+                    "title": f"Title {i}",
+                    "profile_url": f"https://linkedin.com/in/user-{i}",
+                    "page_id": sample_page.id,
+                }
+                for i in range(1, 11)
+            ]
+        )
+        await db_session.commit()
         
-        response = client.get(f"/api/v1/pages/{sample_page.page_id}/followers?page=1&page_size=5")
+        response = await client.head(f"/api/v1/pages/{sample_page.page_id}/followers?page=1&page_size=5")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert len(data["items"]) == 5
-        assert data["total"] == 10
-        assert data["has_next"] is True
+        assert response.headers["X-Page-Size"] == "5"
+        assert response.headers["X-Total-Count"] == "10"
+        assert "page=2" in response.headers["Link"]
+        assert 'rel="next"' in response.headers["Link"]
+        # Followers have no cursor parameter, so links are always page-numbered
+        assert "cursor=" not in response.headers["Link"]
     
-    def test_get_page_followers_page_not_found(self, client):
+    async def test_get_page_followers_page_not_found(self, client):
         """Test getting followers for non-existent page"""
-        response = client.get("/api/v1/pages/non-existent/followers")
+        response = await client.get("/api/v1/pages/non-existent/followers")
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
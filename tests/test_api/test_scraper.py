@@ -4,10 +4,12 @@ Tests for scraper endpoints
 import pytest
 from fastapi import status
 
+pytestmark = pytest.mark.db
 
-def test_scrape_profile(client):
+
+async def test_scrape_profile(client):
     """Test scraping a profile"""
-    response = client.post(
+    response = await client.post(
         "/api/v1/scraper/scrape",
         json={
             "profile_url": "https://linkedin.com/in/test"
@@ -19,3 +21,15 @@ def test_scrape_profile(client):
         status.HTTP_500_INTERNAL_SERVER_ERROR
     ]
 
+
+
+async def test_scrape_profile_limit_returns_429(client, scrape_slots_full):
+    """Test scraping is rejected with 429 while every global scrape slot is taken"""
+    response = await client.post(
+        "/api/v1/scraper/scrape",
+        json={
+            "profile_url": "https://linkedin.com/in/test"
+        }
+    )
+    
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
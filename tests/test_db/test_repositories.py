@@ -0,0 +1,222 @@
+"""
+Tests for LinkedIn model repositories
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from linkedin_insights.db.repositories import (
+    CommentRepository,
+    PostRepository,
+    SocialMediaUserRepository,
+)
+from linkedin_insights.models.linkedin import Comment, LinkedInPage, Post, SocialMediaUser
+
+pytestmark = pytest.mark.db
+
+POSTED_AT = datetime(2024, 1, 1, 12, 0)
+
+
+def _post(post_id, **overrides):
+    """Scraped post row"""
+    return {"post_id": post_id, "content": f"Content of {post_id}", "like_count": 1, "posted_at": POSTED_AT, **overrides}
+
+
+def _comment(comment_id, post_id, **overrides):
+    """Scraped comment row attached to a post's database id"""
+    return {
+        "comment_id": comment_id,
+        "post_id": post_id,
+        "author_name": "Jane Doe",
+        "content": f"Comment {comment_id}",
+        "created_at": POSTED_AT,
+        **overrides,
+    }
+
+
+def _user(linkedin_user_id, **overrides):
+    """Scraped employee row"""
+    return {
+        "linkedin_user_id": linkedin_user_id,
+        "name": f"User {linkedin_user_id}",
+        "profile_url": f"https://www.linkedin.com/in/{linkedin_user_id}",
+        **overrides,
+    }
+
+
+class TestPostBulkUpsert:
+    """Tests for PostRepository.bulk_upsert"""
+    
+    async def test_inserts_and_updates(self, db_session, sample_page, sample_posts):
+        """Test new posts are inserted, existing ones updated, and every id is returned"""
+        repo = PostRepository(Post, db_session)
+        
+        ids = await repo.bulk_upsert(
+            [_post("post-1", like_count=999), _post("post-new", like_count=7)],
+            sample_page.id,
+        )
+        
+        rows = {
+            row.post_id: row
+            for row in (await db_session.execute(
+                select(Post.id, Post.post_id, Post.page_id, Post.like_count)
+            )).all()
+        }
+        assert ids == {"post-1": rows["post-1"].id, "post-new": rows["post-new"].id}
+        assert ids["post-1"] == sample_posts[0].id
+        assert rows["post-1"].like_count == 999
+        assert rows["post-new"].like_count == 7
+        assert rows["post-new"].page_id == sample_page.id
+        assert len(rows) == 6
+    
+    async def test_keeps_page_of_existing_post(self, db_session, sample_page, sample_posts, get_industry):
+        """Test an update never moves a post to another page"""
+        other_page = LinkedInPage(
+            page_id="other-company",
+            name="Other Company",
+            url="https://www.linkedin.com/company/other-company",
+            industry_ref=await get_industry("Technology"),
+        )
+        db_session.add(other_page)
+        await db_session.flush()
+        
+        await PostRepository(Post, db_session).bulk_upsert([_post("post-1")], other_page.id)
+        
+        page_id = await db_session.scalar(select(Post.page_id).where(Post.post_id == "post-1"))
+        assert page_id == sample_page.id
+    
+    async def test_empty_input(self, db_session, sql_statements):
+        """Test empty input returns an empty map without touching the database"""
+        assert await PostRepository(Post, db_session).bulk_upsert([], page_id=1) == {}
+        assert sql_statements == []
+
+
+class TestPostUpsertBatch:
+    """Tests for PostRepository.upsert_batch"""
+    
+    async def test_refreshes_in_one_select(self, db_session, sample_page, sql_statements):
+        """Test the upserted posts are reloaded with a single IN query, not one refresh each"""
+        sql_statements.clear()
+        
+        posts = await PostRepository(Post, db_session).upsert_batch(
+            [_post("post-a"), _post("post-b"), _post("post-c")], sample_page.id
+        )
+        
+        refreshes = [s for s in sql_statements if "WHERE posts.id IN" in s]
+        assert len(refreshes) == 1
+        assert [post.post_id for post in posts] == ["post-a", "post-b", "post-c"]
+        assert all(post.page_id == sample_page.id for post in posts)
+    
+    async def test_failed_row_keeps_the_others(self, db_session, sample_page):
+        """Test a row that fails is skipped while the rows around it are kept"""
+        posts = await PostRepository(Post, db_session).upsert_batch(
+            [_post("post-a"), {"content": "No post_id"}, _post("post-b")], sample_page.id
+        )
+        
+        stored = (await db_session.scalars(select(Post.post_id).order_by(Post.post_id))).all()
+        assert [post.post_id for post in posts] == ["post-a", "post-b"]
+        assert stored == ["post-a", "post-b"]
+
+
+class TestCommentBulkUpsert:
+    """Tests for CommentRepository.bulk_upsert"""
+    
+    async def test_comments_land_on_mapped_posts(self, db_session, sample_page):
+        """Test comments attach to the posts through the post_id -> id map"""
+        post_ids = await PostRepository(Post, db_session).bulk_upsert(
+            [_post("post-a"), _post("post-b")], sample_page.id
+        )
+        scraped = {"post-a": ["comment-a1", "comment-a2"], "post-b": ["comment-b1"]}
+        
+        count = await CommentRepository(Comment, db_session).bulk_upsert([
+            _comment(comment_id, post_ids[post_id])
+            for post_id, comment_ids in scraped.items()
+            for comment_id in comment_ids
+        ])
+        
+        rows = (await db_session.execute(
+            select(Comment.comment_id, Post.post_id).join(Post, Comment.post_id == Post.id)
+        )).all()
+        assert count == 3
+        assert sorted(tuple(row) for row in rows) == [
+            ("comment-a1", "post-a"),
+            ("comment-a2", "post-a"),
+            ("comment-b1", "post-b"),
+        ]
+    
+    async def test_inserts_and_updates(self, db_session, sample_posts):
+        """Test existing comments are updated in place and new ones inserted"""
+        repo = CommentRepository(Comment, db_session)
+        await repo.bulk_upsert([_comment("comment-1", sample_posts[0].id)])
+        
+        count = await repo.bulk_upsert([
+            _comment("comment-1", sample_posts[1].id, content="Edited"),
+            _comment("comment-2", sample_posts[1].id),
+        ])
+        
+        rows = {
+            row.comment_id: row
+            for row in (await db_session.execute(
+                select(Comment.comment_id, Comment.post_id, Comment.content)
+            )).all()
+        }
+        assert count == 2
+        assert rows["comment-1"].content == "Edited"
+        assert rows["comment-1"].post_id == sample_posts[0].id
+        assert rows["comment-2"].post_id == sample_posts[1].id
+    
+    async def test_empty_input(self, db_session, sql_statements):
+        """Test empty input upserts nothing without touching the database"""
+        assert await CommentRepository(Comment, db_session).bulk_upsert([]) == 0
+        assert sql_statements == []
+
+
+class TestSocialMediaUserBulkUpsert:
+    """Tests for SocialMediaUserRepository.bulk_upsert"""
+    
+    async def test_inserts_and_updates(self, db_session, sample_page):
+        """Test existing employees are updated and new ones inserted for the page"""
+        repo = SocialMediaUserRepository(SocialMediaUser, db_session)
+        await repo.bulk_upsert([_user("jane-doe", title="Engineer")], sample_page.id)
+        
+        count = await repo.bulk_upsert(
+            [_user("jane-doe", title="Staff Engineer"), _user("john-roe")],
+            sample_page.id,
+        )
+        
+        rows = {
+            row.linkedin_user_id: row
+            for row in (await db_session.execute(
+                select(SocialMediaUser.linkedin_user_id, SocialMediaUser.page_id, SocialMediaUser.title)
+            )).all()
+        }
+        assert count == 2
+        assert set(rows) == {"jane-doe", "john-roe"}
+        assert rows["jane-doe"].title == "Staff Engineer"
+        assert rows["john-roe"].page_id == sample_page.id
+    
+    async def test_users_are_scoped_to_page(self, db_session, sample_page, get_industry):
+        """Test the same LinkedIn user on another page becomes a separate row"""
+        other_page = LinkedInPage(
+            page_id="other-company",
+            name="Other Company",
+            url="https://www.linkedin.com/company/other-company",
+            industry_ref=await get_industry("Technology"),
+        )
+        db_session.add(other_page)
+        await db_session.flush()
+        repo = SocialMediaUserRepository(SocialMediaUser, db_session)
+        
+        await repo.bulk_upsert([_user("jane-doe")], sample_page.id)
+        await repo.bulk_upsert([_user("jane-doe")], other_page.id)
+        
+        page_ids = (await db_session.scalars(
+            select(SocialMediaUser.page_id).where(SocialMediaUser.linkedin_user_id == "jane-doe")
+        )).all()
+        assert sorted(page_ids) == sorted([sample_page.id, other_page.id])
+    
+    async def test_empty_input(self, db_session, sql_statements):
+        """Test empty input upserts nothing without touching the database"""
+        assert await SocialMediaUserRepository(SocialMediaUser, db_session).bulk_upsert([], page_id=1) == 0
+        assert sql_statements == []
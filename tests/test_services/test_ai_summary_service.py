@@ -0,0 +1,193 @@
+"""
+Tests for AI summary service
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from linkedin_insights.services.ai_summary_service import AISummaryService, BATCH_ENDPOINT, CircuitBreaker
+
+SUMMARY = {
+    "summary": "A large enterprise page with steady engagement.",
+    "page_type": "Enterprise",
+    "audience": "Large",
+    "engagement": "Moderate",
+}
+
+
+class FakeFiles:
+    """Stand-in for client.files: keeps uploads in memory"""
+    
+    def __init__(self):
+        self.uploads = {}
+        self.outputs = {}
+    
+    async def create(self, file, purpose):
+        file_id = f"file-{len(self.uploads) + 1}"
+        self.uploads[file_id] = (file, purpose)
+        return SimpleNamespace(id=file_id)
+    
+    async def content(self, file_id):
+        return SimpleNamespace(text=self.outputs[file_id])
+
+
+class FakeBatches:
+    """Stand-in for client.batches: batches complete when told to"""
+    
+    def __init__(self):
+        self.batches = {}
+    
+    async def create(self, input_file_id, endpoint, completion_window):
+        batch = SimpleNamespace(
+            id=f"batch-{len(self.batches) + 1}",
+            input_file_id=input_file_id,
+            endpoint=endpoint,
+            completion_window=completion_window,
+            status="in_progress",
+            output_file_id=None,
+        )
+        self.batches[batch.id] = batch
+        return batch
+    
+    async def retrieve(self, batch_id):
+        return self.batches[batch_id]
+
+
+@pytest.fixture
+def fake_client():
+    """Fake AsyncOpenAI client exposing only the Batch API surface"""
+    return SimpleNamespace(files=FakeFiles(), batches=FakeBatches())
+
+
+@pytest.fixture
+def service(fake_client):
+    """AISummaryService wired to the fake client"""
+    ai_service = AISummaryService()
+    ai_service.enabled = True
+    ai_service.client = fake_client
+    return ai_service
+
+
+async def test_batch_round_trip(service, fake_client):
+    """Test enqueue_batch uploads one JSONL request per page and retrieve_batch parses the output"""
+    batch_id = await service.enqueue_batch({
+        "acme-corp": {"name": "Acme Corp", "total_followers": 50000},
+        "globex": {"name": "Globex"},
+    })
+    
+    batch = fake_client.batches.batches[batch_id]
+    assert batch.endpoint == BATCH_ENDPOINT
+    assert batch.completion_window == "24h"
+    (filename, payload), purpose = fake_client.files.uploads[batch.input_file_id]
+    assert purpose == "batch"
+    requests = [json.loads(line) for line in payload.decode("utf-8").splitlines()]
+    assert [request["custom_id"] for request in requests] == ["acme-corp", "globex"]
+    assert all(request["url"] == BATCH_ENDPOINT for request in requests)
+    assert "Acme Corp" in requests[0]["body"]["messages"][-1]["content"]
+    
+    # Not finished yet
+    assert await service.retrieve_batch(batch_id) is None
+    
+    fake_client.files.outputs["file-out"] = "\n".join([
+        json.dumps({
+            "custom_id": "acme-corp",
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": json.dumps(SUMMARY)}}]},
+            },
+        }),
+        json.dumps({
+            "custom_id": "globex",
+            "response": {"status_code": 500, "body": {}},
+            "error": "server_error",
+        }),
+    ])
+    batch.status = "completed"
+    batch.output_file_id = "file-out"
+    
+    assert await service.retrieve_batch(batch_id) == {"acme-corp": SUMMARY}
+
+
+async def test_batch_disabled_without_client():
+    """Test batch calls are no-ops when the service is disabled"""
+    ai_service = AISummaryService()
+    ai_service.enabled = False
+    
+    assert await ai_service.enqueue_batch({"acme-corp": {"name": "Acme Corp"}}) is None
+    assert await ai_service.retrieve_batch("batch-1") is None
+
+
+def _completion(content, finish_reason="stop"):
+    """Chat completion response shaped like the OpenAI SDK's"""
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+@pytest.mark.parametrize(
+    "content,finish_reason,expected",
+    [
+        (json.dumps(SUMMARY), "stop", SUMMARY),
+        ('{"summary": "A large enterprise page with', "length", None),
+        ("not json", "stop", None),
+        (json.dumps({"summary": "Missing classifications"}), "stop", None),
+        (None, "stop", None),
+    ],
+    ids=["valid", "truncated", "invalid-json", "missing-fields", "refusal"],
+)
+async def test_generate_summary_validates_json(service, content, finish_reason, expected):
+    """Test truncated, malformed or incomplete model output is discarded"""
+    async def create(**request):
+        return _completion(content, finish_reason)
+    
+    service.client.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+    
+    summary = await service.generate_summary({"name": "Acme Corp", "generated_at": None})
+    
+    if expected is None:
+        assert summary is None
+    else:
+        assert {key: summary[key] for key in expected} == expected
+
+
+@pytest.mark.parametrize(
+    "model,format_type",
+    [("gpt-4o-mini", "json_schema"), ("gpt-3.5-turbo", "json_object")],
+)
+def test_response_format_falls_back_to_json_mode(service, monkeypatch, model, format_type):
+    """Test models without structured outputs are sent JSON mode instead of json_schema"""
+    monkeypatch.setattr(
+        "linkedin_insights.services.ai_summary_service.settings.OPENAI_MODEL", model
+    )
+    
+    body = service._build_request_body({"name": "Acme Corp"})
+    
+    assert body["model"] == model
+    assert body["response_format"]["type"] == format_type
+
+
+@pytest.mark.pure
+def test_circuit_breaker_single_half_open_probe(monkeypatch):
+    """Test only one trial call gets through once the cool-down elapses"""
+    now = [100.0]
+    monkeypatch.setattr("linkedin_insights.services.ai_summary_service.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+    
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    
+    now[0] += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    
+    # A failed probe reopens for a full cool-down
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    now[0] += 30
+    assert breaker.allow_request()
+    
+    breaker.record_success()
+    assert breaker.allow_request()
+    assert breaker.allow_request()
@@ -0,0 +1,175 @@
+"""
+Tests for LinkedIn page service
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from linkedin_insights.models.linkedin import Comment, LinkedInPage, Post, SocialMediaUser
+from linkedin_insights.services.linkedin_page_service import LinkedInPageService
+
+pytestmark = pytest.mark.db
+
+
+def _scraped_data():
+    """Scraper output for one page with two posts, three comments and two employees"""
+    return {
+        "page_info": {
+            "page_id": "acme-corp",
+            "name": "Acme Corp",
+            "url": "https://www.linkedin.com/company/acme-corp",
+            "industry": "Technology",
+            "total_followers": 50000,
+            "head_count": 250,
+        },
+        "posts": [
+            {
+                "post_id": "post-1",
+                "content": "Launch day",
+                "like_count": 120,
+                "comment_count": 2,
+                "posted_at": "2024-01-02T09:00:00Z",
+                "comments": [
+                    {"comment_id": "comment-1", "author_name": "Jane Doe", "content": "Congrats", "created_at": "2024-01-02T10:00:00Z"},
+                    {"comment_id": "comment-2", "author_name": "John Roe", "content": "Nice", "created_at": "2024-01-02T11:00:00Z"},
+                ],
+            },
+            {
+                "post_id": "post-2",
+                "content": "Hiring",
+                "like_count": 40,
+                "comment_count": 1,
+                "posted_at": "2024-01-01T09:00:00Z",
+                "comments": [
+                    {"comment_id": "comment-3", "author_name": "Jane Doe", "content": "Applied", "created_at": "2024-01-01T10:00:00Z"},
+                ],
+            },
+        ],
+        "employees": [
+            {"linkedin_user_id": "jane-doe", "name": "Jane Doe", "title": "Engineer", "profile_url": "https://www.linkedin.com/in/jane-doe"},
+            {"linkedin_user_id": "john-roe", "name": "John Roe", "title": None, "profile_url": "https://www.linkedin.com/in/john-roe"},
+        ],
+    }
+
+
+def _integrity_error():
+    """IntegrityError as raised by a UNIQUE constraint violation"""
+    return IntegrityError("INSERT INTO posts ...", {}, Exception("UNIQUE constraint failed: posts.post_id"))
+
+
+async def _post_ids(db_session):
+    """Sorted LinkedIn post_ids of all stored posts"""
+    return sorted((await db_session.scalars(select(Post.post_id))).all())
+
+
+async def test_process_scraped_data_persists_everything(db_session):
+    """Test the page, posts, comments and employees are all written"""
+    result = await LinkedInPageService(db_session).process_scraped_data(_scraped_data())
+    
+    assert result["success"] is True
+    assert result["posts_processed"] == 2
+    assert result["employees_processed"] == 2
+    
+    page = await db_session.scalar(select(LinkedInPage).where(LinkedInPage.page_id == "acme-corp"))
+    assert result["page_id"] == page.id
+    assert page.industry == "Technology"
+    assert page.total_followers == 50000
+    
+    assert await _post_ids(db_session) == ["post-1", "post-2"]
+    comments = (await db_session.execute(
+        select(Comment.comment_id, Post.post_id).join(Post, Comment.post_id == Post.id)
+    )).all()
+    assert sorted(tuple(row) for row in comments) == [
+        ("comment-1", "post-1"),
+        ("comment-2", "post-1"),
+        ("comment-3", "post-2"),
+    ]
+    employees = (await db_session.scalars(
+        select(SocialMediaUser.linkedin_user_id).where(SocialMediaUser.page_id == page.id)
+    )).all()
+    assert sorted(employees) == ["jane-doe", "john-roe"]
+
+
+async def test_process_scraped_data_updates_on_rescrape(db_session):
+    """Test scraping the same page twice updates rows instead of duplicating them"""
+    service = LinkedInPageService(db_session)
+    await service.process_scraped_data(_scraped_data())
+    
+    rescraped = _scraped_data()
+    rescraped["posts"][0]["like_count"] = 500
+    result = await service.process_scraped_data(rescraped)
+    
+    assert result["success"] is True
+    assert await _post_ids(db_session) == ["post-1", "post-2"]
+    assert await db_session.scalar(select(Post.like_count).where(Post.post_id == "post-1")) == 500
+    assert len((await db_session.scalars(select(Comment.id))).all()) == 3
+
+
+async def test_bulk_write_retries_integrity_error(db_session, monkeypatch):
+    """Test a write that hits an IntegrityError is rolled back and retried once"""
+    service = LinkedInPageService(db_session)
+    bulk_upsert = service.post_repo.bulk_upsert
+    attempts = 0
+    
+    async def flaky_bulk_upsert(posts_data, page_id):
+        nonlocal attempts
+        attempts += 1
+        ids = await bulk_upsert(posts_data, page_id)
+        if attempts == 1:
+            # Rows were written before the error, as in a lost race
+            raise _integrity_error()
+        return ids
+    
+    monkeypatch.setattr(service.post_repo, "bulk_upsert", flaky_bulk_upsert)
+    
+    result = await service.process_scraped_data(_scraped_data())
+    
+    assert attempts == 2
+    assert result["success"] is True
+    assert result["posts_processed"] == 2
+    assert await _post_ids(db_session) == ["post-1", "post-2"]
+    assert len((await db_session.scalars(select(Comment.id))).all()) == 3
+
+
+async def test_bulk_write_rolls_back_after_second_failure(db_session, monkeypatch):
+    """Test two IntegrityErrors roll the write back and skip its dependants"""
+    service = LinkedInPageService(db_session)
+    bulk_upsert = service.post_repo.bulk_upsert
+    attempts = 0
+    
+    async def failing_bulk_upsert(posts_data, page_id):
+        nonlocal attempts
+        attempts += 1
+        await bulk_upsert(posts_data, page_id)
+        raise _integrity_error()
+    
+    monkeypatch.setattr(service.post_repo, "bulk_upsert", failing_bulk_upsert)
+    
+    result = await service.process_scraped_data(_scraped_data())
+    
+    assert attempts == 2
+    assert result["posts_processed"] == 0
+    assert await _post_ids(db_session) == []
+    assert (await db_session.scalars(select(Comment.id))).all() == []
+    # Only the failed write is lost; the rest of the scrape is committed
+    assert result["employees_processed"] == 2
+    assert await db_session.scalar(select(LinkedInPage.id).where(LinkedInPage.page_id == "acme-corp")) is not None
+
+
+async def test_get_page_with_relations(db_session, sample_page, sample_posts):
+    """Test the page is returned with its posts and employees"""
+    db_session.add(SocialMediaUser(
+        linkedin_user_id="jane-doe",
+        name="Jane Doe",
+        profile_url="https://www.linkedin.com/in/jane-doe",
+        page_id=sample_page.id,
+    ))
+    await db_session.flush()
+    service = LinkedInPageService(db_session)
+    
+    result = await service.get_page_with_relations("test-company")
+    
+    assert result["page"].id == sample_page.id
+    assert sorted(post.post_id for post in result["posts"]) == [post.post_id for post in sample_posts]
+    assert [user.linkedin_user_id for user in result["employees"]] == ["jane-doe"]
+    assert await service.get_page_with_relations("missing-company") is None
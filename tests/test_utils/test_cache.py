@@ -0,0 +1,234 @@
+"""
+Tests for caching decorators
+"""
+import asyncio
+import time
+
+import orjson
+import pytest
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from linkedin_insights.utils.cache import (
+    _compute_single_flight,
+    _pack_entry,
+    _pending_refreshes,
+    _unpack_entry,
+    cache_response,
+    generate_cache_key,
+)
+from linkedin_insights.utils.redis_client import get_cache, set_cache
+from tests.constants import FAKE_SCRAPED_AT
+
+
+class FakeSessionFactory:
+    """Session factory handing out marker objects and recording their lifetime"""
+    
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+    
+    def __call__(self):
+        return self
+    
+    async def __aenter__(self):
+        session = object()
+        self.opened.append(session)
+        return session
+    
+    async def __aexit__(self, *exc_info):
+        self.closed.append(self.opened[-1])
+
+
+async def _store_stale(cache_key, value):
+    """Store an entry for `value` that went stale a second ago"""
+    entry = _pack_entry(orjson.dumps(value), time.time() - 1)
+    await set_cache(cache_key, entry, 300, serialized=True)
+
+
+class TestSingleFlight:
+    """Tests for dogpile prevention on cache misses"""
+    
+    async def test_concurrent_misses_compute_once(self, fake_redis):
+        """Test N concurrent misses run the function once and all get its result"""
+        calls = 0
+        
+        @cache_response(key_prefix="single-flight", raw=True)
+        async def get_page(page_id):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"page_id": page_id, "call": calls}
+        
+        results = await asyncio.gather(*(get_page("acme-corp") for _ in range(10)))
+        
+        assert calls == 1
+        assert results == [{"page_id": "acme-corp", "call": 1}] * 10
+    
+    async def test_waiters_get_lock_holders_entry(self, fake_redis):
+        """Test workers that lose the Redis lock poll for and return the stored entry"""
+        calls = 0
+        
+        async def compute_entry():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            await set_cache("workers", b"entry", 60, serialized=True)
+            return b"entry"
+        
+        # Separate calls stand in for separate worker processes (no shared local lock)
+        results = await asyncio.gather(
+            *(_compute_single_flight("workers", compute_entry, 0.01, 5.0) for _ in range(5))
+        )
+        
+        assert calls == 1
+        assert results == [b"entry"] * 5
+        assert await fake_redis.exists("workers:lock") == 0
+    
+    async def test_lock_released_when_compute_raises(self, fake_redis):
+        """Test a failing compute releases the lock so the next caller can compute"""
+        async def failing_compute():
+            assert await fake_redis.exists("failing:lock") == 1
+            raise RuntimeError("scrape failed")
+        
+        with pytest.raises(RuntimeError, match="scrape failed"):
+            await _compute_single_flight("failing", failing_compute, 0.01, 5.0)
+        
+        assert await fake_redis.exists("failing:lock") == 0
+        
+        calls = 0
+        
+        @cache_response(key_prefix="failing-endpoint", raw=True)
+        async def get_page(page_id):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("scrape failed")
+            return {"page_id": page_id}
+        
+        with pytest.raises(RuntimeError):
+            await get_page("acme-corp")
+        
+        # Not blocked for dogpile_max_wait by a leftover lock
+        assert await asyncio.wait_for(get_page("acme-corp"), timeout=1) == {"page_id": "acme-corp"}
+        assert calls == 2
+
+
+class TestStaleWhileRevalidate:
+    """Tests for serving stale entries while refreshing them in the background"""
+    
+    async def test_stale_hit_serves_old_value_and_refreshes_once(self, fake_redis):
+        """Test stale hits return the old body at once and share one background refresh"""
+        release = asyncio.Event()
+        calls = 0
+        
+        @cache_response(key_prefix="swr", policy="short", raw=True, session_factory=FakeSessionFactory())
+        async def get_page(page_id):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"page_id": page_id, "version": "new"}
+        
+        cache_key = generate_cache_key("swr", "acme-corp")
+        await _store_stale(cache_key, {"page_id": "acme-corp", "version": "old"})
+        
+        results = await asyncio.gather(*(get_page("acme-corp") for _ in range(5)))
+        
+        assert results == [{"page_id": "acme-corp", "version": "old"}] * 5
+        refresh = _pending_refreshes[cache_key]
+        release.set()
+        await refresh
+        
+        assert calls == 1
+        assert await get_page("acme-corp") == {"page_id": "acme-corp", "version": "new"}
+        stale_at, _ = _unpack_entry(await get_cache(cache_key, serialized=True))
+        assert stale_at > time.time()
+    
+    async def test_failed_refresh_keeps_stale_value(self, fake_redis):
+        """Test a refresh that raises leaves the stale entry in place"""
+        @cache_response(key_prefix="swr-failing", policy="short", raw=True, session_factory=FakeSessionFactory())
+        async def get_page(page_id):
+            raise RuntimeError("scrape failed")
+        
+        cache_key = generate_cache_key("swr-failing", "acme-corp")
+        await _store_stale(cache_key, {"version": "old"})
+        stored = await get_cache(cache_key, serialized=True)
+        
+        assert await get_page("acme-corp") == {"version": "old"}
+        await _pending_refreshes[cache_key]
+        
+        assert await get_cache(cache_key, serialized=True) == stored
+        assert await get_page("acme-corp") == {"version": "old"}
+    
+    async def test_refresh_uses_fresh_session(self, fake_redis):
+        """Test the refresh gets a session from session_factory, not the request's"""
+        session_factory = FakeSessionFactory()
+        sessions = []
+        
+        @cache_response(key_prefix="swr-session", policy="short", raw=True, session_factory=session_factory)
+        async def get_page(page_id, db):
+            sessions.append(db)
+            return {"version": "new"}
+        
+        request_session = AsyncSession()
+        cache_key = generate_cache_key("swr-session", "acme-corp", request_session)
+        await _store_stale(cache_key, {"version": "old"})
+        
+        assert await get_page("acme-corp", request_session) == {"version": "old"}
+        await _pending_refreshes[cache_key]
+        
+        assert len(session_factory.opened) == 1
+        assert sessions == session_factory.opened
+        assert session_factory.closed == session_factory.opened
+        await request_session.close()
+
+
+class TestEncodedEntries:
+    """Tests for entries cached as pre-encoded JSON"""
+    
+    async def test_hit_returns_stored_bytes(self, fake_redis):
+        """Test a hit serves byte-for-byte the JSON encoded on the miss"""
+        calls = 0
+        value = {"page_id": "acme-corp", "total_followers": 50000, "scraped_at": FAKE_SCRAPED_AT}
+        
+        @cache_response(key_prefix="encoded")
+        async def get_page(page_id):
+            nonlocal calls
+            calls += 1
+            return value
+        
+        miss = await get_page("acme-corp")
+        hit = await get_page("acme-corp")
+        
+        expected = orjson.dumps(jsonable_encoder(value))
+        assert isinstance(hit, Response)
+        assert miss.body == hit.body == expected
+        assert hit.media_type == "application/json"
+        assert calls == 1
+        _, stored_body = _unpack_entry(await get_cache(generate_cache_key("encoded", "acme-corp"), serialized=True))
+        assert stored_body == expected
+    
+    async def test_legacy_entry_is_deleted_and_missed(self, fake_redis):
+        """Test an entry in the old plain-JSON format is dropped and recomputed"""
+        calls = 0
+        
+        @cache_response(key_prefix="legacy", raw=True)
+        async def get_page(page_id):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("scrape failed")
+            return {"version": "new"}
+        
+        cache_key = generate_cache_key("legacy", "acme-corp")
+        await set_cache(cache_key, {"version": "old"})
+        
+        # The failed compute shows the old entry was deleted, not served
+        with pytest.raises(RuntimeError):
+            await get_page("acme-corp")
+        assert await fake_redis.exists(cache_key) == 0
+        
+        await set_cache(cache_key, {"version": "old"})
+        assert await get_page("acme-corp") == {"version": "new"}
+        assert _unpack_entry(await get_cache(cache_key, serialized=True)) is not None
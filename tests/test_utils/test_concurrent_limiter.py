@@ -0,0 +1,63 @@
+"""
+Tests for the Redis concurrent request limiter
+"""
+import time
+
+import pytest
+
+from linkedin_insights.utils import redis_client
+from linkedin_insights.utils.concurrent_limiter import ConcurrencyLimitExceeded, concurrent_limit
+
+
+async def test_limit_rejects_extra_holder(fake_redis):
+    """Test the next caller is rejected while every slot is held"""
+    async with concurrent_limit("scraper:active", 2, 60):
+        async with concurrent_limit("scraper:active", 2, 60):
+            assert await fake_redis.zcard("scraper:active") == 2
+            with pytest.raises(ConcurrencyLimitExceeded, match="limit 2"):
+                async with concurrent_limit("scraper:active", 2, 60):
+                    pass
+    
+    assert await fake_redis.zcard("scraper:active") == 0
+
+
+async def test_slot_released_after_exception(fake_redis):
+    """Test a block that raises still gives its slot back"""
+    with pytest.raises(RuntimeError):
+        async with concurrent_limit("scraper:active", 1, 60):
+            raise RuntimeError("scrape failed")
+    
+    assert await fake_redis.zcard("scraper:active") == 0
+    async with concurrent_limit("scraper:active", 1, 60):
+        pass
+
+
+async def test_abandoned_slots_are_evicted(fake_redis):
+    """Test slots older than the timeout (e.g. a crashed worker's) no longer count"""
+    await fake_redis.zadd("scraper:active", {"crashed-worker": int((time.time() - 120) * 1000)})
+    
+    async with concurrent_limit("scraper:active", 1, 60):
+        assert await fake_redis.zscore("scraper:active", "crashed-worker") is None
+
+
+async def test_no_op_without_redis(monkeypatch):
+    """Test the limiter lets everything through when Redis isn't configured"""
+    monkeypatch.setattr(redis_client, "_redis_client", None)
+    
+    async with concurrent_limit("scraper:active", 1, 60):
+        async with concurrent_limit("scraper:active", 1, 60):
+            pass
+
+
+async def test_fails_open_on_redis_error(fake_redis, monkeypatch):
+    """Test a Redis error while acquiring lets the caller through"""
+    def broken_register_script(script):
+        raise ConnectionError("Redis unavailable")
+    
+    monkeypatch.setattr(fake_redis, "register_script", broken_register_script)
+    ran = False
+    
+    async with concurrent_limit("scraper:active", 1, 60):
+        ran = True
+    
+    assert ran
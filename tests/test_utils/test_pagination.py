@@ -2,17 +2,21 @@
 Tests for pagination utility
 """
 import pytest
-from sqlalchemy.orm import Query
+from hypothesis import given, settings, strategies as st
+from sqlalchemy import select
 
+from linkedin_insights.models.linkedin import LinkedInPage
 from linkedin_insights.utils.pagination import (
     PaginationParams,
     PaginationResult,
+    KeysetPaginationResult,
     paginate_query,
     paginate_query_with_filters,
     create_pagination_metadata,
 )
 
 
+@pytest.mark.pure
 class TestPaginationParams:
     """Tests for PaginationParams class"""
     
@@ -28,16 +32,15 @@ class TestPaginationParams:
         assert params.page == 2
         assert params.page_size == 10
     
-    def test_pagination_params_skip(self):
+    @pytest.mark.parametrize(
+        "page,page_size,expected_skip",
+        [(1, 20, 0), (2, 20, 20), (3, 10, 20)],
+        ids=["first-page", "second-page", "third-page-size-10"],
+    )
+    def test_pagination_params_skip(self, page, page_size, expected_skip):
         """Test skip calculation"""
-        params = PaginationParams(page=1, page_size=20)
-        assert params.skip == 0
-        
-        params = PaginationParams(page=2, page_size=20)
-        assert params.skip == 20
-        
-        params = PaginationParams(page=3, page_size=10)
-        assert params.skip == 20
+        params = PaginationParams(page=page, page_size=page_size)
+        assert params.skip == expected_skip
     
     def test_pagination_params_limit(self):
         """Test limit property"""
@@ -45,6 +48,7 @@ class TestPaginationParams:
         assert params.limit == 15
 
 
+@pytest.mark.pure
 class TestPaginationResult:
     """Tests for PaginationResult class"""
     
@@ -62,34 +66,27 @@ class TestPaginationResult:
         assert result.total_count == 50
         assert result.page == 1
         assert result.page_size == 10
-        assert result.total_pages == 5
-        assert result.has_next is True
-        assert result.has_previous is False
-    
-    def test_pagination_result_no_next(self):
-        """Test when there's no next page"""
-        result = PaginationResult(
-            items=[1, 2, 3],
-            total_count=3,
-            page=1,
-            page_size=10
-        )
-        
-        assert result.total_pages == 1
-        assert result.has_next is False
-        assert result.has_previous is False
     
-    def test_pagination_result_has_previous(self):
-        """Test when there's a previous page"""
+    @pytest.mark.parametrize(
+        "total_count,page,page_size,expected",
+        [
+            (50, 1, 10, {"total_pages": 5, "has_next": True, "has_previous": False}),
+            (3, 1, 10, {"total_pages": 1, "has_next": False, "has_previous": False}),
+            (50, 3, 10, {"total_pages": 5, "has_next": True, "has_previous": True}),
+        ],
+        ids=["first-page", "single-page", "middle-page"],
+    )
+    def test_pagination_result_navigation(self, total_count, page, page_size, expected):
+        """Test total_pages / has_next / has_previous"""
         result = PaginationResult(
             items=[1, 2, 3],
-            total_count=50,
-            page=3,
-            page_size=10
+            total_count=total_count,
+            page=page,
+            page_size=page_size
         )
         
-        assert result.has_previous is True
-        assert result.has_next is True
+        for field, value in expected.items():
+            assert getattr(result, field) == value, field
     
     def test_pagination_result_to_dict(self):
         """Test conversion to dictionary"""
@@ -110,52 +107,109 @@ class TestPaginationResult:
         assert data["total_pages"] == 3
         assert data["has_next"] is True
         assert data["has_previous"] is True
+        assert data["next_cursor"] is None
+    
+    def test_keyset_pagination_result_uses_cursor(self):
+        """Test keyset results derive has_next from next_cursor"""
+        result = KeysetPaginationResult(
+            items=[1, 2],
+            total_count=50,
+            page=1,
+            page_size=2,
+            next_cursor="abc"
+        )
+        
+        assert result.has_next is True
+        assert result.has_previous is True
+        assert result.to_dict()["next_cursor"] == "abc"
+        
+        last_page = KeysetPaginationResult(items=[1], total_count=50, page=1, page_size=2)
+        assert last_page.has_next is False
+
 
+def pagination_oracle(total: int, page: int, size: int):
+    """Reference (total_pages, has_next, has_previous, skip) computation"""
+    total_pages = -(-total // size)
+    return total_pages, page < total_pages, page > 1, (page - 1) * size
 
+
+@pytest.mark.pure
+class TestPaginationProperties:
+    """Property tests comparing pagination arithmetic against an oracle"""
+    
+    @settings(max_examples=2000)
+    @given(
+        total=st.integers(0, 10**9),
+        page=st.integers(1, 10**6),
+        size=st.integers(1, 1000),
+    )
+    def test_pagination_matches_oracle(self, total, page, size):
+        """Test PaginationResult, PaginationParams and metadata agree with the oracle"""
+        total_pages, has_next, has_previous, skip = pagination_oracle(total, page, size)
+        
+        result = PaginationResult(items=[], total_count=total, page=page, page_size=size)
+        assert (result.total_pages, result.has_next, result.has_previous) == (total_pages, has_next, has_previous)
+        
+        metadata = create_pagination_metadata(total_count=total, page=page, page_size=size)
+        assert (metadata["total_pages"], metadata["has_next"], metadata["has_previous"]) == (total_pages, has_next, has_previous)
+        
+        assert PaginationParams(page=page, page_size=size).skip == skip
+
+
+@pytest.mark.db
 class TestPaginateQuery:
     """Tests for paginate_query function"""
     
-    def test_paginate_query_basic(self, db_session, sample_pages):
+    async def test_paginate_query_basic(self, db_session, sample_pages, sql_statements):
         """Test basic pagination"""
-        from linkedin_insights.models.linkedin import LinkedInPage
-        
-        query = db_session.query(LinkedInPage)
-        result = paginate_query(query, page=1, page_size=5)
+        sql_statements.clear()
+        query = select(LinkedInPage)
+        result = await paginate_query(query, db_session, page=1, page_size=5)
         
         assert len(result.items) == 5
         assert result.total_count == 10
         assert result.page == 1
         assert result.page_size == 5
         assert result.total_pages == 2
+        
+        # LIMIT/OFFSET must be pushed into SQL, never fetch-all-then-slice
+        page_selects = [s for s in sql_statements if "FROM linkedin_pages" in s]
+        assert page_selects
+        assert all("LIMIT" in s and "OFFSET" in s for s in page_selects)
     
-    def test_paginate_query_second_page(self, db_session, sample_pages):
-        """Test pagination on second page"""
-        from linkedin_insights.models.linkedin import LinkedInPage
+    async def test_paginate_query_single_round_trip(self, db_session, sample_pages, sql_statements):
+        """Test items and total come from one windowed-count query"""
+        sql_statements.clear()
+        query = select(LinkedInPage)
+        result = await paginate_query(query, db_session, page=2, page_size=3)
         
-        query = db_session.query(LinkedInPage)
-        result = paginate_query(query, page=2, page_size=5)
+        assert result.total_count == 10
+        selects = [s for s in sql_statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 1
+        assert "OVER ()" in selects[0]
+    
+    async def test_paginate_query_second_page(self, db_session, sample_pages):
+        """Test pagination on second page"""
+        query = select(LinkedInPage)
+        result = await paginate_query(query, db_session, page=2, page_size=5)
         
         assert len(result.items) == 5
         assert result.page == 2
         assert result.total_pages == 2
     
-    def test_paginate_query_last_page(self, db_session, sample_pages):
+    async def test_paginate_query_last_page(self, db_session, sample_pages):
         """Test pagination on last page"""
-        from linkedin_insights.models.linkedin import LinkedInPage
-        
-        query = db_session.query(LinkedInPage)
-        result = paginate_query(query, page=2, page_size=8)
+        query = select(LinkedInPage)
+        result = await paginate_query(query, db_session, page=2, page_size=8)
         
         assert len(result.items) == 2  # Only 2 items left
         assert result.page == 2
         assert result.has_next is False
     
-    def test_paginate_query_empty_result(self, db_session):
+    async def test_paginate_query_empty_result(self, db_session):
         """Test pagination with empty result"""
-        from linkedin_insights.models.linkedin import LinkedInPage
-        
-        query = db_session.query(LinkedInPage).filter(LinkedInPage.page_id == "non-existent")
-        result = paginate_query(query, page=1, page_size=10)
+        query = select(LinkedInPage).filter(LinkedInPage.page_id == "non-existent")
+        result = await paginate_query(query, db_session, page=1, page_size=10)
         
         assert len(result.items) == 0
         assert result.total_count == 0
@@ -163,39 +217,35 @@ class TestPaginateQuery:
         assert result.has_next is False
         assert result.has_previous is False
     
-    def test_paginate_query_invalid_page(self, db_session, sample_pages):
+    async def test_paginate_query_invalid_page(self, db_session, sample_pages):
         """Test pagination with invalid page number"""
-        from linkedin_insights.models.linkedin import LinkedInPage
-        
-        query = db_session.query(LinkedInPage)
+        query = select(LinkedInPage)
         # Should default to page 1 if invalid
-        result = paginate_query(query, page=0, page_size=10)
+        result = await paginate_query(query, db_session, page=0, page_size=10)
         
         assert result.page == 1
     
-    def test_paginate_query_large_page_size(self, db_session, sample_pages):
+    async def test_paginate_query_large_page_size(self, db_session, sample_pages):
         """Test pagination with page size exceeding limit"""
-        from linkedin_insights.models.linkedin import LinkedInPage
-        
-        query = db_session.query(LinkedInPage)
+        query = select(LinkedInPage)
         # Should cap at 100
-        result = paginate_query(query, page=1, page_size=200)
+        result = await paginate_query(query, db_session, page=1, page_size=200)
         
         assert result.page_size == 100
 
 
+@pytest.mark.db
 class TestPaginateQueryWithFilters:
     """Tests for paginate_query_with_filters function"""
     
-    def test_paginate_query_with_ordering(self, db_session, sample_pages):
+    async def test_paginate_query_with_ordering(self, db_session, sample_pages):
         """Test pagination with ordering"""
-        from linkedin_insights.models.linkedin import LinkedInPage
-        
-        query = db_session.query(LinkedInPage)
+        query = select(LinkedInPage)
         pagination = PaginationParams(page=1, page_size=5)
         
-        result = paginate_query_with_filters(
+        result = await paginate_query_with_filters(
             query,
+            db_session,
             pagination,
             order_by=LinkedInPage.total_followers.desc()
         )
@@ -205,53 +255,33 @@ class TestPaginateQueryWithFilters:
         followers = [item.total_followers for item in result.items]
         assert followers == sorted(followers, reverse=True)
     
-    def test_paginate_query_without_ordering(self, db_session, sample_pages):
+    async def test_paginate_query_without_ordering(self, db_session, sample_pages):
         """Test pagination without ordering"""
-        from linkedin_insights.models.linkedin import LinkedInPage
-        
-        query = db_session.query(LinkedInPage)
+        query = select(LinkedInPage)
         pagination = PaginationParams(page=1, page_size=5)
         
-        result = paginate_query_with_filters(query, pagination)
+        result = await paginate_query_with_filters(query, db_session, pagination)
         
         assert len(result.items) == 5
 
 
+@pytest.mark.pure
 class TestCreatePaginationMetadata:
     """Tests for create_pagination_metadata function"""
     
-    def test_create_pagination_metadata(self):
+    @pytest.mark.parametrize(
+        "total_count,page,page_size,expected",
+        [
+            (100, 2, 20, {"total": 100, "page": 2, "page_size": 20, "total_pages": 5, "has_next": True, "has_previous": True}),
+            (0, 1, 20, {"total": 0, "total_pages": 0, "has_next": False, "has_previous": False}),
+            (50, 5, 10, {"total_pages": 5, "has_next": False, "has_previous": True}),
+            (50, 1, 10, {"has_next": True, "has_previous": False}),
+        ],
+        ids=["middle-page", "no-items", "last-page", "first-page"],
+    )
+    def test_create_pagination_metadata(self, total_count, page, page_size, expected):
         """Test creating pagination metadata"""
-        metadata = create_pagination_metadata(total_count=100, page=2, page_size=20)
+        metadata = create_pagination_metadata(total_count=total_count, page=page, page_size=page_size)
         
-        assert metadata["total"] == 100
-        assert metadata["page"] == 2
-        assert metadata["page_size"] == 20
-        assert metadata["total_pages"] == 5
-        assert metadata["has_next"] is True
-        assert metadata["has_previous"] is True
-    
-    def test_create_pagination_metadata_no_items(self):
-        """Test metadata with no items"""
-        metadata = create_pagination_metadata(total_count=0, page=1, page_size=20)
-        
-        assert metadata["total"] == 0
-        assert metadata["total_pages"] == 0
-        assert metadata["has_next"] is False
-        assert metadata["has_previous"] is False
-    
-    def test_create_pagination_metadata_last_page(self):
-        """Test metadata on last page"""
-        metadata = create_pagination_metadata(total_count=50, page=5, page_size=10)
-        
-        assert metadata["total_pages"] == 5
-        assert metadata["has_next"] is False
-        assert metadata["has_previous"] is True
-    
-    def test_create_pagination_metadata_first_page(self):
-        """Test metadata on first page"""
-        metadata = create_pagination_metadata(total_count=50, page=1, page_size=10)
-        
-        assert metadata["has_next"] is True
-        assert metadata["has_previous"] is False
-
+        for field, value in expected.items():
+            assert metadata[field] == value, field
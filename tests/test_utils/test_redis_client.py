@@ -0,0 +1,122 @@
+"""
+Tests for Redis client utility
+"""
+import pytest
+
+from linkedin_insights.utils.redis_client import (
+    COMPRESSION_THRESHOLD,
+    FLAG_RAW,
+    FLAG_ZSTD,
+    _decode_value,
+    _encode_value,
+    get_and_touch,
+    get_cache,
+    get_or_reserve,
+    release_lock,
+    set_cache,
+)
+
+
+class TestGetOrReserve:
+    """Tests for the get-or-reserve and release-lock Lua scripts"""
+    
+    async def test_miss_reserves_lock_once(self, fake_redis):
+        """Test only the first caller on a miss gets the lock"""
+        assert await get_or_reserve("key", "key:lock", "token-a", 5000) == (None, True)
+        assert await get_or_reserve("key", "key:lock", "token-b", 5000) == (None, False)
+        
+        assert await fake_redis.get("key:lock") == b"token-a"
+        assert 0 < await fake_redis.pttl("key:lock") <= 5000
+    
+    async def test_hit_returns_value_without_lock(self, fake_redis):
+        """Test a cached value is returned and no lock is taken"""
+        await set_cache("key", {"name": "Acme Corp"}, ttl=60)
+        
+        assert await get_or_reserve("key", "key:lock", "token-a", 5000) == ({"name": "Acme Corp"}, False)
+        assert await fake_redis.exists("key:lock") == 0
+    
+    async def test_release_requires_matching_token(self, fake_redis):
+        """Test release deletes the lock only for the token that holds it"""
+        await get_or_reserve("key", "key:lock", "token-a", 5000)
+        
+        assert await release_lock("key:lock", "token-b") is False
+        assert await fake_redis.get("key:lock") == b"token-a"
+        
+        assert await release_lock("key:lock", "token-a") is True
+        assert await fake_redis.exists("key:lock") == 0
+        
+        # The lock is free again
+        assert await get_or_reserve("key", "key:lock", "token-b", 5000) == (None, True)
+
+
+class TestGetAndTouch:
+    """Tests for the pipelined GET + EXPIRE"""
+    
+    async def test_refreshes_ttl_in_one_pipeline(self, fake_redis):
+        """Test a hit returns the value and slides the TTL in a single pipeline"""
+        await set_cache("key", {"name": "Acme Corp"}, ttl=10)
+        
+        pipelines = []
+        make_pipeline = fake_redis.pipeline
+        
+        def counting_pipeline(*args, **kwargs):
+            pipe = make_pipeline(*args, **kwargs)
+            pipelines.append(pipe)
+            return pipe
+        
+        async def unexpected_command(*args, **kwargs):
+            raise AssertionError(f"Command sent outside the pipeline: {args}")
+        
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(fake_redis, "pipeline", counting_pipeline)
+            mp.setattr(fake_redis, "execute_command", unexpected_command)
+            assert await get_and_touch("key", ttl=300) == {"name": "Acme Corp"}
+        assert len(pipelines) == 1
+        assert 10 < await fake_redis.ttl("key") <= 300
+    
+    async def test_miss_returns_none(self, fake_redis):
+        """Test a missing key returns None"""
+        assert await get_and_touch("missing", ttl=300) is None
+
+
+@pytest.mark.pure
+class TestValueEncoding:
+    """Tests for the flagged, optionally zstd-compressed value encoding"""
+    
+    @pytest.mark.parametrize(
+        "size,flag",
+        [
+            (COMPRESSION_THRESHOLD - 1, FLAG_RAW),
+            (COMPRESSION_THRESHOLD, FLAG_RAW),
+            (COMPRESSION_THRESHOLD + 1, FLAG_ZSTD),
+        ],
+        ids=["below", "at", "above"],
+    )
+    def test_serialized_round_trip(self, size, flag):
+        """Test bytes survive encoding unchanged and compress only above the threshold"""
+        payload = b'"' + b"x" * (size - 2) + b'"'
+        
+        encoded = _encode_value(payload, serialized=True)
+        
+        assert encoded[:1] == flag
+        assert _decode_value(encoded, serialized=True) == payload
+        assert _decode_value(encoded) == "x" * (size - 2)
+    
+    @pytest.mark.parametrize("count", [10, 1000])
+    def test_object_round_trip(self, count):
+        """Test JSON-serializable objects round-trip, compressed or not"""
+        value = {"posts": [{"post_id": f"post-{i}", "like_count": i} for i in range(count)]}
+        
+        assert _decode_value(_encode_value(value)) == value
+    
+    @pytest.mark.parametrize("raw", [b'{"name": "Acme Corp"}', b"\x02payload"], ids=["unprefixed", "unknown"])
+    def test_unknown_flag_rejected(self, raw):
+        """Test values without a known flag byte are rejected"""
+        with pytest.raises(ValueError, match="Unknown cache value flag"):
+            _decode_value(raw)
+    
+    async def test_unknown_flag_is_cache_miss(self, fake_redis):
+        """Test get_cache treats a value with an unknown flag as a miss"""
+        await fake_redis.set("key", b'{"name": "Acme Corp"}')
+        
+        assert await get_cache("key") is None